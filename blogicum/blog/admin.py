@@ -1,6 +1,15 @@
 from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.db.models import Count
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.utils.html import format_html_join
 
-from .models import Category, Comment, Location, Post, Tag
+from .constants import (IMAGE_DUPLICATE_CLUSTERS_LIMIT,
+                        IMAGE_DUPLICATE_DISTANCE)
+from .image_similarity import similar_posts
+from .models import (Category, Comment, ImageHash, ImageJob, Location, Post,
+                     Tag)
 
 
 admin.site.empty_value_display = 'Не задано'
@@ -33,15 +42,63 @@ class LocationAdmin(admin.ModelAdmin):
 
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
-    list_display = ('title', 'author', 'pub_date', 'is_published')
+    list_display = ('title', 'author', 'pub_date', 'is_published',
+                    'is_visible')
     list_editable = ('is_published',)
-    list_filter = ('author', 'is_published')
+    list_filter = ('author', 'is_published', 'is_visible')
     list_display_links = ('title',)
     search_fields = ('title', 'text')
     raw_id_fields = ('author',)
     date_hierarchy = 'pub_date'
     ordering = ('pub_date',)
     filter_horizontal = ('tags',)
+    readonly_fields = ('similar_images',)
+    change_list_template = 'admin/blog/post/change_list.html'
+
+    def get_urls(self):
+        return [
+            path('duplicates/',
+                 self.admin_site.admin_view(self.duplicates_view),
+                 name='blog_post_duplicates'),
+        ] + super().get_urls()
+
+    @admin.display(description='Похожие картинки')
+    def similar_images(self, post):
+        similar = [(distance, pk) for distance, pk in similar_posts(
+            post.image_hash) if pk != post.pk]
+        titles = dict(Post.objects.filter(
+            pk__in=[pk for _, pk in similar]).values_list('pk', 'title'))
+        return format_html_join(
+            ', ', '<a href="{}">{}</a> ({})',
+            ((reverse('admin:blog_post_change', args=(pk,)), titles[pk],
+              distance) for distance, pk in similar if pk in titles)
+        ) or None
+
+    def duplicates_view(self, request):
+        """Группы собирает обработчик картинок и команда
+        cluster_image_duplicates, здесь они только читаются."""
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        clusters = ImageHash.objects.exclude(cluster=None).values(
+            'cluster').annotate(size=Count('pk')).filter(
+            size__gt=1).order_by('-size', 'cluster')
+        shown = clusters[:IMAGE_DUPLICATE_CLUSTERS_LIMIT]
+        posts = {}
+        for post in Post.objects.select_related(
+                'author', 'image_hash_index').filter(
+                image_hash_index__cluster__in=[
+                    row['cluster'] for row in shown]).order_by('pk'):
+            posts.setdefault(post.image_hash_index.cluster, []).append(post)
+        return TemplateResponse(
+            request, 'admin/blog/post/duplicates.html', {
+                **self.admin_site.each_context(request),
+                'opts': self.model._meta,
+                'title': 'Публикации с похожими картинками',
+                'distance': IMAGE_DUPLICATE_DISTANCE,
+                'total': clusters.count(),
+                'clusters': [posts[row['cluster']] for row in shown
+                             if row['cluster'] in posts],
+            })
 
 
 @admin.register(Comment)
@@ -61,3 +118,13 @@ class TagAdmin(admin.ModelAdmin):
     list_filter = ('tag',)
     search_fields = ('tag',)
     prepopulated_fields = {'slug': ['tag']}
+
+
+@admin.register(ImageJob)
+class ImageJobAdmin(admin.ModelAdmin):
+    list_display = ('source', 'post', 'status', 'attempts', 'created_at',
+                    'finished_at')
+    list_filter = ('status',)
+    search_fields = ('source',)
+    raw_id_fields = ('post',)
+    readonly_fields = ('error',)
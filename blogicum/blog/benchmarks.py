@@ -0,0 +1,127 @@
+import tracemalloc
+from time import perf_counter
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.cache import cache
+from django.db.models import F
+from django.test import Client
+from django.urls import URLPattern, URLResolver, get_resolver, resolve, reverse
+
+from .budgets import percentile
+from .instrumentation import collect_query_stats
+from .models import Comment, Tag
+from .scheduler import publish_due_posts
+
+BENCHMARK_NAMESPACES = ('blog', 'pages')
+REGRESSION_METRICS = ('p95_ms', 'queries', 'peak_kib')
+
+
+def iter_view_names(patterns=None, namespace=None):
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_view_names(
+                pattern.url_patterns, pattern.namespace or namespace)
+        elif (isinstance(pattern, URLPattern) and pattern.name
+              and namespace in BENCHMARK_NAMESPACES):
+            yield f'{namespace}:{pattern.name}', tuple(
+                pattern.pattern.converters)
+
+
+def sample_kwargs():
+    """Подбирает для параметров URL объекты с наибольшей нагрузкой:
+    самый комментируемый видимый пост, его автора, категорию и по
+    возможности комментарий самого автора, чтобы формы редактирования
+    отвечали 200, а не 403."""
+    comments = Comment.objects.select_related(
+        'post__author', 'post__category').filter(
+        post__is_visible=True).order_by('-post__comment_count')
+    comment = comments.filter(author=F('post__author')).first() or (
+        comments.first())
+    if comment is None:
+        return None, {}
+    post = comment.post
+    values = {
+        'post_id': post.pk,
+        'comment_id': comment.pk,
+        'username': post.author.username,
+        'category_slug': post.category.slug,
+    }
+    tag = Tag.objects.filter(post__is_visible=True).first()
+    if tag is not None:
+        values['tag_slug'] = tag.slug
+    return post.author, values
+
+
+def benchmark_targets():
+    author, values = sample_kwargs()
+    for view_name, params in iter_view_names():
+        if any(param not in values for param in params):
+            continue
+        url = reverse(view_name, kwargs={
+            param: values[param] for param in params})
+        view_class = getattr(resolve(url).func, 'view_class', None)
+        login_required = bool(view_class) and issubclass(
+            view_class, LoginRequiredMixin)
+        yield view_name, url, author if login_required else None
+
+
+def measure(client, url, runs, cold=True):
+    durations_ms = []
+    queries = rows = 0
+    for _ in range(runs):
+        if cold:
+            cache.clear()
+            publish_due_posts()
+        started = perf_counter()
+        with collect_query_stats() as stats:
+            response = client.get(url)
+        durations_ms.append((perf_counter() - started) * 1000)
+        queries = max(queries, stats.queries)
+        rows = max(rows, stats.rows)
+    if cold:
+        cache.clear()
+        publish_due_posts()
+    tracemalloc.start()
+    try:
+        client.get(url)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        'status': response.status_code,
+        'p50_ms': round(percentile(durations_ms, 0.5), 3),
+        'p95_ms': round(percentile(durations_ms, 0.95), 3),
+        'p99_ms': round(percentile(durations_ms, 0.99), 3),
+        'queries': queries,
+        'rows': rows,
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+
+def run_benchmarks(runs, cold=True):
+    anonymous, author = Client(), Client()
+    results = {}
+    for view_name, url, user in benchmark_targets():
+        if user is not None:
+            author.force_login(user)
+        client = anonymous if user is None else author
+        results[view_name] = dict(url=url, **measure(client, url, runs, cold))
+    return results
+
+
+def find_regressions(current, baseline, threshold):
+    """Сравнивает результаты двух прогонов: {размер: {view: метрики}}."""
+    regressions = []
+    for size, views in current.items():
+        for view_name, metrics in views.items():
+            previous = baseline.get(size, {}).get(view_name)
+            if previous is None:
+                continue
+            for metric in REGRESSION_METRICS:
+                before, after = previous[metric], metrics[metric]
+                if after > before * (1 + threshold):
+                    regressions.append(
+                        f'{view_name} [{size}]: {metric} {before} → {after}')
+    return regressions
@@ -0,0 +1,82 @@
+import logging
+from collections import defaultdict, deque
+from typing import NamedTuple
+
+from .constants import BUDGET_SAMPLE_SIZE
+
+logger = logging.getLogger(__name__)
+
+AUTHENTICATED_QUERIES = 2
+AUTHENTICATED_ROWS = 2
+
+
+class ViewBudget(NamedTuple):
+    queries: int
+    rows: int
+    p95_ms: float
+
+
+VIEW_BUDGETS = {
+    'blog:index': ViewBudget(queries=4, rows=80, p95_ms=250),
+    'blog:category_posts': ViewBudget(queries=4, rows=80, p95_ms=250),
+    'blog:profile': ViewBudget(queries=4, rows=80, p95_ms=250),
+    'blog:tag': ViewBudget(queries=4, rows=80, p95_ms=250),
+    'blog:post_detail': ViewBudget(queries=5, rows=40, p95_ms=250),
+    'blog:post_comments': ViewBudget(queries=5, rows=40, p95_ms=150),
+    # При холодном кэше перечитывается весь список id опубликованных постов.
+    'blog:random': ViewBudget(queries=3, rows=200, p95_ms=100),
+    'blog:edit_post': ViewBudget(queries=5, rows=500, p95_ms=250),
+    'blog:delete_post': ViewBudget(queries=2, rows=5, p95_ms=150),
+    'blog:edit_comment': ViewBudget(queries=2, rows=5, p95_ms=150),
+    'blog:delete_comment': ViewBudget(queries=1, rows=5, p95_ms=150),
+    'pages:about': ViewBudget(queries=0, rows=0, p95_ms=50),
+    'pages:rules': ViewBudget(queries=0, rows=0, p95_ms=50),
+}
+
+
+def get_budget(view_name, authenticated=False):
+    budget = VIEW_BUDGETS.get(view_name)
+    if budget is None or not authenticated:
+        return budget
+    return budget._replace(queries=budget.queries + AUTHENTICATED_QUERIES,
+                           rows=budget.rows + AUTHENTICATED_ROWS)
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+def budget_violations(budget, queries, rows, durations_ms=()):
+    violations = []
+    if queries > budget.queries:
+        violations.append(f'запросов {queries} > {budget.queries}')
+    if rows > budget.rows:
+        violations.append(f'строк {rows} > {budget.rows}')
+    p95 = percentile(durations_ms, 0.95)
+    if p95 > budget.p95_ms:
+        violations.append(f'p95 {p95:.1f} мс > {budget.p95_ms} мс')
+    return violations
+
+
+class BudgetRecorder:
+    """Хранит последние замеры каждого view в памяти процесса."""
+
+    def __init__(self, sample_size=BUDGET_SAMPLE_SIZE):
+        self.durations = defaultdict(lambda: deque(maxlen=sample_size))
+        self.violations = defaultdict(int)
+
+    def record(self, view_name, budget, queries, rows, duration_ms):
+        durations = self.durations[view_name]
+        durations.append(duration_ms)
+        violations = budget_violations(budget, queries, rows, durations)
+        if violations:
+            self.violations[view_name] += 1
+            logger.warning('View %s превышает бюджет: %s',
+                           view_name, ', '.join(violations))
+        return violations
+
+
+recorder = BudgetRecorder()
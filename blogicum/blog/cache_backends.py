@@ -0,0 +1,109 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.core.cache.backends.locmem import LocMemCache
+
+from .metrics import registry
+from .timing import record_cache_call
+
+_current_call = ContextVar('current_cache_call', default=None)
+
+
+def cache_layer(key):
+    """Слой кэша для метрик: фрагмент шаблона или префикс ключа blog."""
+    if key.startswith('template.cache.'):
+        return 'fragment:' + key.split('.')[2].strip('\'"')
+    prefix, _, rest = key.partition(':')
+    if prefix == 'blog' and rest:
+        return rest.split(':')[0]
+    return 'other'
+
+
+class CacheCall:
+    def __init__(self):
+        self.layer = None
+        self.hits = 0
+        self.misses = 0
+
+
+class InstrumentedCacheMixin:
+    """Передаёт время обращений к кэшу в blog.timing, а попадания и промахи
+    по слоям — ещё и в blog.metrics. Время замеряется только у внешнего
+    вызова: get_many и get_or_set базового класса сами вызывают get()."""
+
+    @contextmanager
+    def measure(self):
+        call = _current_call.get()
+        if call is not None:
+            yield call
+            return
+        call = CacheCall()
+        token = _current_call.set(call)
+        started = perf_counter()
+        try:
+            yield call
+        finally:
+            _current_call.reset(token)
+            record_cache_call(
+                perf_counter() - started, call.hits, call.misses)
+            if call.hits:
+                registry.inc('blog_cache_hits_total', call.hits,
+                             layer=call.layer)
+            if call.misses:
+                registry.inc('blog_cache_misses_total', call.misses,
+                             layer=call.layer)
+
+    def get(self, key, default=None, version=None):
+        with self.measure() as call:
+            call.layer = call.layer or cache_layer(key)
+            value = super().get(key, self._missing_key, version=version)
+            if value is self._missing_key:
+                call.misses += 1
+                return default
+            call.hits += 1
+            return value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        with self.measure() as call:
+            if keys:
+                call.layer = call.layer or cache_layer(keys[0])
+            counted = call.hits + call.misses
+            values = super().get_many(keys, version=version)
+            if call.hits + call.misses == counted:
+                call.hits += len(values)
+                call.misses += len(keys) - len(values)
+            return values
+
+    def get_or_set(self, *args, **kwargs):
+        with self.measure():
+            return super().get_or_set(*args, **kwargs)
+
+    def set(self, *args, **kwargs):
+        with self.measure():
+            return super().set(*args, **kwargs)
+
+    def add(self, *args, **kwargs):
+        with self.measure():
+            return super().add(*args, **kwargs)
+
+    def set_many(self, *args, **kwargs):
+        with self.measure():
+            return super().set_many(*args, **kwargs)
+
+    def incr(self, *args, **kwargs):
+        with self.measure():
+            return super().incr(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with self.measure():
+            return super().delete(*args, **kwargs)
+
+    def delete_many(self, *args, **kwargs):
+        with self.measure():
+            return super().delete_many(*args, **kwargs)
+
+
+class InstrumentedLocMemCache(InstrumentedCacheMixin, LocMemCache):
+    pass
@@ -0,0 +1,48 @@
+from django.core.cache import cache
+
+
+def cache_version(key):
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, None)
+        version = cache.get(key, 1)
+    return version
+
+
+def bump_cache_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, None)
+
+
+def page_dependency_key(dependency):
+    return f'blog:page_dependency:{dependency}'
+
+
+def page_dependency_versions(dependencies):
+    keys = {page_dependency_key(dependency): dependency
+            for dependency in dependencies}
+    versions = cache.get_many(keys)
+    for key in keys.keys() - versions.keys():
+        cache.add(key, 1, None)
+        versions[key] = cache.get(key, 1)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def invalidate_pages(*dependencies):
+    for dependency in dependencies:
+        try:
+            cache.incr(page_dependency_key(dependency))
+        except ValueError:
+            pass
+
+
+def post_dependencies(post):
+    dependencies = {f'post:{post.pk}', f'author:{post.author_id}'}
+    if post.category_id:
+        dependencies.add(f'category:{post.category_id}')
+    if post.location_id:
+        dependencies.add(f'location:{post.location_id}')
+    dependencies.update(f'tag:{tag.pk}' for tag in post.tags.all())
+    return dependencies
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Tags, Warning, register
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_default_cache(app_configs, **kwargs):
+    """Версии зависимостей страниц и карточек живут в кэше default: у
+    кэша в памяти процесса запись в одном worker не сбрасывает страницы
+    остальных."""
+    if settings.DEBUG or not isinstance(caches['default'], LocMemCache):
+        return []
+    return [Warning(
+        'Кэш default хранится в памяти процесса: при нескольких '
+        'worker-процессах сохранение сбрасывает кэш страниц и карточек '
+        'только в одном из них.',
+        hint='Укажите общий бэкенд (Redis, Memcached, база данных) '
+             'для CACHES["default"].',
+        id='blog.W001',
+    )]
@@ -1,2 +1,34 @@
 CHARACTERS_COUNT: int = 256
 SHOWED_ITEMS: int = 10
+CURSOR_QUERY_PARAM: str = 'cursor'
+SEARCH_RESULTS_LIMIT: int = 1000
+POST_CARD_CACHE_TIMEOUT: int = 60 * 60
+# Версии зависимостей страниц хранятся в кэше default; если он в памяти
+# процесса, другие worker отдают старую страницу до этого срока
+# (см. проверку blog.W001).
+PAGE_CACHE_TIMEOUT: int = 5 * 60
+COMMENTS_PER_PAGE: int = 20
+COMMENTS_QUERY_PARAM: str = 'comments'
+BUDGET_SAMPLE_SIZE: int = 200
+SQL_PROFILE_MAX_FINGERPRINTS: int = 500
+METRICS_FLUSH_INTERVAL: int = 5
+METRICS_LATENCY_BUCKETS: tuple = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SLOW_REQUEST_SAMPLE_INTERVAL: float = 0.05
+SLOW_REQUEST_MAX_QUERIES: int = 200
+PROFILE_QUERY_PARAM: str = 'profile'
+PROFILE_COOKIE: str = 'blog_profile'
+PROFILE_SAMPLE_INTERVAL: float = 0.001
+IMAGE_DERIVATIVE_WIDTHS: tuple = (320, 640, 1024)
+IMAGE_JOB_MAX_ATTEMPTS: int = 3
+IMAGE_JOB_TIMEOUT: int = 10 * 60
+IMAGE_RESIZE_MAX_DIMENSION: int = 2048
+RESIZED_IMAGE_SIGNATURE_PARAM: str = 's'
+RESIZED_IMAGE_MAX_AGE: int = 365 * 24 * 60 * 60
+RESIZED_CACHE_EVICT_RATIO: float = 0.9
+IMAGE_GC_MIN_AGE: int = 24 * 60 * 60
+IMAGE_GC_BATCH_SIZE: int = 500
+IMAGE_HASH_SIZE: int = 8
+IMAGE_HASH_BANDS: int = 4
+IMAGE_DUPLICATE_DISTANCE: int = 10
+IMAGE_DUPLICATE_CLUSTERS_LIMIT: int = 100
@@ -0,0 +1,7 @@
+from .constants import POST_CARD_CACHE_TIMEOUT
+
+
+def post_card_cache(request):
+    return {
+        'post_card_cache_timeout': POST_CARD_CACHE_TIMEOUT,
+    }
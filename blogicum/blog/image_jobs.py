@@ -0,0 +1,146 @@
+import logging
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import timedelta
+from multiprocessing import get_context
+from time import sleep
+
+from django.db.models import F
+from django.utils import timezone
+
+from .caching import invalidate_pages, post_dependencies
+from .constants import IMAGE_JOB_MAX_ATTEMPTS, IMAGE_JOB_TIMEOUT
+from .image_similarity import assign_image_cluster, index_image_hash
+from .images import build_derivatives, delete_derivatives
+from .models import ImageJob, Post
+
+logger = logging.getLogger(__name__)
+
+
+def set_image_derivatives(post, derivatives):
+    post.image_derivatives = derivatives
+    post.image_hash = derivatives.get('dhash', '')
+    Post.objects.filter(pk=post.pk).update(
+        image_derivatives=derivatives, image_hash=post.image_hash)
+    index_image_hash(post)
+    assign_image_cluster(post)
+    invalidate_pages(*post_dependencies(post))
+
+
+def enqueue_image_job(post):
+    """Ставит в очередь сборку копий, если картинка сменилась; снятую
+    картинку убирает сразу, это дёшево."""
+    derivatives = post.image_derivatives or {}
+    source = post.image.name if post.image else ''
+    if derivatives.get('source', '') == source:
+        return None
+    if not source:
+        delete_derivatives(derivatives)
+        set_image_derivatives(post, {})
+        return None
+    return ImageJob.objects.filter(
+        post=post, source=source,
+        status__in=(ImageJob.PENDING, ImageJob.RUNNING),
+    ).first() or ImageJob.objects.create(post=post, source=source)
+
+
+def requeue_stale_jobs():
+    """Возвращает в очередь задания, брошенные упавшим обработчиком."""
+    return ImageJob.objects.filter(
+        status=ImageJob.RUNNING,
+        started_at__lt=timezone.now() - timedelta(seconds=IMAGE_JOB_TIMEOUT),
+    ).update(status=ImageJob.PENDING)
+
+
+def claim_jobs(limit):
+    claimed = []
+    pending = ImageJob.objects.filter(
+        status=ImageJob.PENDING).values_list('pk', flat=True)[:limit]
+    for pk in pending:
+        if ImageJob.objects.filter(pk=pk, status=ImageJob.PENDING).update(
+                status=ImageJob.RUNNING, started_at=timezone.now(),
+                attempts=F('attempts') + 1):
+            claimed.append(pk)
+    return list(ImageJob.objects.filter(pk__in=claimed))
+
+
+def complete_job(job, derivatives):
+    post = Post.objects.filter(pk=job.post_id).first()
+    if post is None or post.image.name != job.source:
+        # Картинку успели сменить или удалить: копии уже не нужны.
+        delete_derivatives(derivatives)
+    else:
+        if (post.image_derivatives or {}).get('source') != job.source:
+            delete_derivatives(post.image_derivatives)
+        set_image_derivatives(post, derivatives)
+    job.status, job.error = ImageJob.DONE, ''
+    job.finished_at = timezone.now()
+    job.save(update_fields=('status', 'error', 'finished_at'))
+
+
+def fail_job(job, error):
+    logger.warning('Не удалось обработать картинку %s: %s',
+                   job.source, error)
+    job.status = (ImageJob.FAILED if job.attempts >= IMAGE_JOB_MAX_ATTEMPTS
+                  else ImageJob.PENDING)
+    job.error = error
+    job.finished_at = timezone.now()
+    job.save(update_fields=('status', 'error', 'finished_at'))
+
+
+def run_job_inline(job):
+    try:
+        derivatives = build_derivatives(job.source)
+    except Exception:
+        fail_job(job, traceback.format_exc())
+    else:
+        complete_job(job, derivatives)
+
+
+def finish_job(job, future):
+    try:
+        derivatives = future.result()
+    except Exception:
+        fail_job(job, traceback.format_exc())
+    else:
+        complete_job(job, derivatives)
+
+
+def run_inline(once, poll_interval):
+    while True:
+        jobs = claim_jobs(1)
+        for job in jobs:
+            run_job_inline(job)
+        if not jobs:
+            if once:
+                return
+            sleep(poll_interval)
+
+
+def run_pool(processes, once, poll_interval):
+    running = {}
+    with ProcessPoolExecutor(processes,
+                             mp_context=get_context('fork')) as executor:
+        while True:
+            for job in claim_jobs(processes - len(running)):
+                running[executor.submit(build_derivatives, job.source)] = job
+            if not running:
+                if once:
+                    return
+                sleep(poll_interval)
+                continue
+            done, _ = wait(running, timeout=poll_interval,
+                           return_when=FIRST_COMPLETED)
+            for future in done:
+                finish_job(running.pop(future), future)
+
+
+def run_worker(processes, once=False, poll_interval=1.0):
+    """Разбирает очередь ImageJob. Картинки обрабатываются в пуле из
+    `processes` процессов, при processes=0 — в текущем процессе; БД
+    трогает только текущий процесс."""
+    requeue_stale_jobs()
+    if processes:
+        run_pool(processes, once, poll_interval)
+    else:
+        run_inline(once, poll_interval)
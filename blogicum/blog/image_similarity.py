@@ -0,0 +1,89 @@
+from functools import reduce
+from itertools import combinations
+from operator import or_
+
+from django.db.models import Q
+
+from .constants import (IMAGE_DUPLICATE_DISTANCE, IMAGE_HASH_BANDS,
+                        IMAGE_HASH_SIZE)
+from .models import ImageHash
+
+HASH_BITS = IMAGE_HASH_SIZE * IMAGE_HASH_SIZE
+BAND_BITS = HASH_BITS // IMAGE_HASH_BANDS
+BAND_FIELDS = tuple(f'band_{band}' for band in range(IMAGE_HASH_BANDS))
+
+
+def hamming(first, second):
+    return bin(first ^ second).count('1')
+
+
+def hash_bands(image_hash):
+    """Значения колонок band_* модели ImageHash."""
+    value = int(image_hash, 16)
+    mask = (1 << BAND_BITS) - 1
+    return {field: value >> (band * BAND_BITS) & mask
+            for band, field in enumerate(BAND_FIELDS)}
+
+
+def band_neighbours(value, radius):
+    """Все значения части, отличающиеся от `value` не больше чем на
+    `radius` бит."""
+    return [
+        reduce(lambda result, bit: result ^ 1 << bit, bits, value)
+        for distance in range(radius + 1)
+        for bits in combinations(range(BAND_BITS), distance)]
+
+
+def candidates_filter(image_hash, radius):
+    """Условие на кандидатов в multi-index hashing: если хеши отличаются
+    не больше чем на `radius` бит, то хотя бы одна из частей отличается
+    не больше чем на radius // IMAGE_HASH_BANDS бит. При radius меньше
+    числа частей это точное совпадение одной из частей, и каждая часть
+    ищется по своему индексу."""
+    band_radius = radius // IMAGE_HASH_BANDS
+    return reduce(or_, (
+        Q(**{f'{field}__in': band_neighbours(value, band_radius)})
+        for field, value in hash_bands(image_hash).items()))
+
+
+def similar_posts(image_hash, radius=IMAGE_DUPLICATE_DISTANCE):
+    """Пары (расстояние, pk публикации), ближайшие первыми."""
+    if not image_hash:
+        return []
+    value = int(image_hash, 16)
+    candidates = ImageHash.objects.filter(
+        candidates_filter(image_hash, radius)).values_list(
+        'post_id', 'value')
+    return sorted(
+        (distance, pk) for distance, pk in (
+            (hamming(value, int(other, 16)), pk)
+            for pk, other in candidates.iterator())
+        if distance <= radius)
+
+
+def index_image_hash(post):
+    """Обновляет запись публикации в ImageHash по её image_hash."""
+    if not post.image_hash:
+        ImageHash.objects.filter(post=post).delete()
+        return
+    ImageHash.objects.update_or_create(post=post, defaults={
+        'value': post.image_hash, 'cluster': None,
+        **hash_bands(post.image_hash)})
+
+
+def assign_image_cluster(post, radius=IMAGE_DUPLICATE_DISTANCE):
+    """Включает публикацию в группу похожих картинок. Группа помечается
+    наименьшим pk среди участников; если картинка связала несколько
+    групп, они сливаются."""
+    similar = [pk for _, pk in similar_posts(post.image_hash, radius)
+               if pk != post.pk]
+    if not similar:
+        return None
+    clusters = {
+        cluster or pk for pk, cluster in ImageHash.objects.filter(
+            post__in=similar).values_list('post_id', 'cluster')}
+    cluster = min(clusters | {post.pk})
+    ImageHash.objects.filter(
+        Q(post__in=[*similar, post.pk]) | Q(cluster__in=clusters)
+    ).update(cluster=cluster)
+    return cluster
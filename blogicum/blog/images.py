@@ -0,0 +1,68 @@
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from .constants import IMAGE_DERIVATIVE_WIDTHS, IMAGE_HASH_SIZE
+
+DERIVATIVE_FORMATS = {
+    'webp': ('WEBP', 'image/webp', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', 'image/jpeg',
+            {'quality': 85, 'optimize': True, 'progressive': True}),
+}
+
+
+def derivative_name(name, width, extension):
+    path = PurePosixPath(name)
+    return str(path.with_name(f'{path.stem}.w{width}.{extension}'))
+
+
+def dhash(image, size=IMAGE_HASH_SIZE):
+    """Разностный хеш: знаки перепадов яркости соседних пикселей
+    уменьшенной серой копии. Пережатие, масштаб и небольшая обрезка
+    меняют лишь несколько бит."""
+    pixels = list(image.convert('L').resize(
+        (size + 1, size), Image.LANCZOS).getdata())
+    value = 0
+    for row in range(size):
+        for index in range(row * (size + 1), row * (size + 1) + size):
+            value = value << 1 | (pixels[index] > pixels[index + 1])
+    return f'{value:0{size * size // 4}x}'
+
+
+def build_derivatives(name, storage=default_storage):
+    """Сохраняет рядом с оригиналом уменьшенные по ширине копии в WebP и
+    JPEG и возвращает их описание для Post.image_derivatives.
+
+    Не обращается к БД, поэтому выполняется в процессах пула обработки.
+    """
+    with storage.open(name, 'rb') as file:
+        image = ImageOps.exif_transpose(Image.open(file))
+        image.load()
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    renditions = []
+    for width in sorted({min(width, image.width)
+                         for width in IMAGE_DERIVATIVE_WIDTHS}):
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize(
+            (width, height), Image.LANCZOS)
+        for extension, (image_format, content_type, options) in (
+                DERIVATIVE_FORMATS.items()):
+            buffer = BytesIO()
+            resized.save(buffer, image_format, **options)
+            saved_name = storage.save(
+                derivative_name(name, width, extension),
+                ContentFile(buffer.getvalue()))
+            renditions.append({'name': saved_name, 'width': width,
+                               'height': height, 'type': content_type})
+    return {'source': name, 'width': image.width,
+            'height': image.height, 'dhash': dhash(image),
+            'renditions': renditions}
+
+
+def delete_derivatives(derivatives, storage=default_storage):
+    for rendition in (derivatives or {}).get('renditions', ()):
+        storage.delete(rendition['name'])
@@ -0,0 +1,77 @@
+from contextlib import contextmanager
+from time import perf_counter
+
+from django.db import connection
+
+
+class RowCountingCursor:
+    """Обёртка над курсором DB-API, считающая полученные строки для всех
+    счётчиков, через которые прошёл последний запрос."""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.context = None
+        self.collectors = []
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+    def attach(self, collector, context):
+        if self.context is not context:
+            self.context = context
+            self.collectors = []
+        self.collectors.append(collector)
+
+    def count(self, rows):
+        for collector in self.collectors:
+            collector.rows += rows
+
+    def __iter__(self):
+        for row in self.cursor:
+            self.count(1)
+            yield row
+
+    def fetchone(self):
+        row = self.cursor.fetchone()
+        if row is not None:
+            self.count(1)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self.cursor.fetchmany(*args, **kwargs)
+        self.count(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self.cursor.fetchall()
+        self.count(len(rows))
+        return rows
+
+
+class QueryStats:
+    """Счётчик запросов, строк и времени, подключаемый через
+    connection.execute_wrapper()."""
+
+    def __init__(self):
+        self.queries = 0
+        self.rows = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        wrapper = context['cursor']
+        if not isinstance(wrapper.cursor, RowCountingCursor):
+            wrapper.cursor = RowCountingCursor(wrapper.cursor)
+        wrapper.cursor.attach(self, context)
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += perf_counter() - started
+            self.queries += 1
+
+
+@contextmanager
+def collect_query_stats(stats=None):
+    stats = QueryStats() if stats is None else stats
+    with connection.execute_wrapper(stats):
+        yield stats
@@ -0,0 +1,121 @@
+import json
+import subprocess
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    override_settings, setup_test_environment, teardown_test_environment)
+from django.utils import timezone
+
+from blog.benchmarks import find_regressions, run_benchmarks
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ('git', 'describe', '--always', '--dirty'), cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+class Command(BaseCommand):
+    help = ('Замеряет views из blog и pages на синтетических данных '
+            'нескольких размеров и сравнивает с предыдущим прогоном.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[1000, 10000],
+            help='Количество публикаций в наборах данных.')
+        parser.add_argument('--runs', type=int, default=30)
+        parser.add_argument(
+            '--warm', action='store_true',
+            help='Не сбрасывать кэш перед каждым запросом.')
+        parser.add_argument(
+            '--output-dir', type=Path,
+            default=settings.BASE_DIR / 'benchmarks')
+        parser.add_argument(
+            '--baseline', type=Path,
+            help='Файл с результатами для сравнения; по умолчанию — '
+                 'последний прогон из --output-dir.')
+        parser.add_argument(
+            '--threshold', type=float, default=0.2,
+            help='Допустимый относительный рост p95, числа запросов и '
+                 'пиковой памяти.')
+        parser.add_argument('--fail-on-regression', action='store_true')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        commit = current_commit()
+        output_dir = options['output_dir']
+        output_path = output_dir / f'{commit}.json'
+        baseline_path = options['baseline'] or self.latest_result(
+            output_dir, exclude=output_path)
+        baseline = baseline_path and json.loads(baseline_path.read_text())
+        results = {}
+        setup_test_environment()
+        try:
+            with override_settings(DEBUG=False,
+                                   BLOG_RECORD_VIEW_BUDGETS=False):
+                for size in options['sizes']:
+                    results[str(size)] = self.benchmark_size(size, options)
+        finally:
+            teardown_test_environment()
+
+        output_dir.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(json.dumps({
+            'commit': commit,
+            'created_at': timezone.now().isoformat(),
+            'runs': options['runs'],
+            'warm': options['warm'],
+            'results': results,
+        }, ensure_ascii=False, indent=2))
+        self.stdout.write(f'Результаты сохранены в {output_path}')
+
+        if baseline is None:
+            return
+        regressions = find_regressions(
+            results, baseline['results'], options['threshold'])
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS(
+                f'Регрессий относительно {baseline["commit"]} нет.'))
+            return
+        for regression in regressions:
+            self.stdout.write(self.style.WARNING(regression))
+        if options['fail_on_regression']:
+            raise CommandError(
+                f'Регрессии относительно {baseline["commit"]}: '
+                f'{len(regressions)}.')
+
+    def latest_result(self, output_dir, exclude):
+        results = sorted(
+            (path for path in output_dir.glob('*.json') if path != exclude),
+            key=lambda path: path.stat().st_mtime)
+        return results[-1] if results else None
+
+    def benchmark_size(self, size, options):
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True)
+        try:
+            call_command(
+                'seed_blog', posts=size, comments=size * 3,
+                users=max(10, size // 100), categories=max(3, size // 1000),
+                locations=max(3, size // 500), tags=max(5, size // 200),
+                seed=options['seed'], stdout=StringIO())
+            results = run_benchmarks(options['runs'], not options['warm'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{size} публикаций'))
+        for view_name, metrics in results.items():
+            self.stdout.write(
+                f'  {view_name:<22} {metrics["status"]} '
+                f'p50={metrics["p50_ms"]} p95={metrics["p95_ms"]} '
+                f'p99={metrics["p99_ms"]} мс, '
+                f'запросов={metrics["queries"]}, '
+                f'память={metrics["peak_kib"]} КиБ')
+        return results
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from blog.image_jobs import enqueue_image_job
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = ('Ставит в очередь сборку уменьшенных копий картинок '
+            'публикаций; выполняет её run_image_worker.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Пересобрать копии, даже если картинка не менялась.')
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='').only(
+            'pk', 'image', 'image_derivatives', 'image_hash', 'author_id',
+            'category_id', 'location_id')
+        queued = 0
+        for post in posts.iterator():
+            # Картинкам, обработанным до появления хешей, хеш досчитывается.
+            if ((options['force'] or not post.image_hash)
+                    and post.image_derivatives):
+                post.image_derivatives['source'] = None
+            queued += enqueue_image_job(post) is not None
+        self.stdout.write(self.style.SUCCESS(
+            f'Картинок в очереди: {queued}.'))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.constants import IMAGE_DUPLICATE_DISTANCE
+from blog.image_similarity import assign_image_cluster
+from blog.models import ImageHash, Post
+
+
+class Command(BaseCommand):
+    help = ('Заново собирает группы публикаций с похожими картинками; '
+            'новые картинки обработчик добавляет в группы сам.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--distance', type=int, default=IMAGE_DUPLICATE_DISTANCE,
+            help='Сколько бит хеша могут различаться у похожих картинок.')
+
+    def handle(self, *args, **options):
+        posts = Post.objects.filter(image_hash_index__isnull=False).only(
+            'pk', 'image_hash').order_by('pk')
+        with transaction.atomic():
+            ImageHash.objects.exclude(cluster=None).update(cluster=None)
+            for post in posts.iterator():
+                assign_image_cluster(post, options['distance'])
+        clusters = ImageHash.objects.exclude(cluster=None).values(
+            'cluster').distinct().count()
+        self.stdout.write(self.style.SUCCESS(
+            f'Групп похожих картинок: {clusters}'))
@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.utils import timezone
+
+from blog.constants import IMAGE_GC_BATCH_SIZE, IMAGE_GC_MIN_AGE
+from blog.models import Post
+from blog.storage import is_blob
+
+
+def iter_files(storage, directory):
+    directories, files = storage.listdir(directory)
+    for name in files:
+        yield f'{directory}/{name}'
+    for name in directories:
+        yield from iter_files(storage, f'{directory}/{name}')
+
+
+def reference_counts(names):
+    return dict(Post.objects.filter(image__in=names).order_by().values(
+        'image').annotate(total=Count('pk')).values_list('image', 'total'))
+
+
+class Command(BaseCommand):
+    help = ('Удаляет из хранилища картинки публикаций, на которые не '
+            'ссылается ни одна публикация.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-age', type=int, default=IMAGE_GC_MIN_AGE,
+            help='Не трогать файлы моложе стольких секунд: их публикация '
+                 'может быть ещё не сохранена.')
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        field = Post._meta.get_field('image')
+        storage = field.storage
+        if not storage.exists(field.upload_to):
+            return
+        cutoff = timezone.now() - timedelta(seconds=options['min_age'])
+        freed, batch = [], []
+        for name in iter_files(storage, field.upload_to):
+            if not is_blob(name):
+                continue
+            batch.append(name)
+            if len(batch) == IMAGE_GC_BATCH_SIZE:
+                freed += self.collect(
+                    storage, batch, cutoff, options['dry_run'])
+                batch = []
+        freed += self.collect(storage, batch, cutoff, options['dry_run'])
+        verb = 'Будет удалено' if options['dry_run'] else 'Удалено'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} файлов: {len(freed)}, {sum(freed)} байт'))
+
+    def collect(self, storage, names, cutoff, dry_run):
+        """Размеры удалённых файлов; время изменения проверяется после
+        запроса ссылок, чтобы не удалить только что загруженный файл."""
+        referenced = reference_counts(names)
+        freed = []
+        for name in names:
+            if (name in referenced
+                    or storage.get_modified_time(name) > cutoff):
+                continue
+            freed.append(storage.size(name))
+            if not dry_run:
+                storage.delete(name)
+        return freed
@@ -0,0 +1,58 @@
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from blog.constants import SHOWED_ITEMS
+from blog.models import Category, Post, Tag
+from blog.paginators import NEXT, CursorPaginator
+from blog.utils import comments_paginator, filtered_posts_queryset
+
+
+class Command(BaseCommand):
+    help = ('Показывает планы и время выполнения основных запросов ленты, '
+            'например на данных из seed_blog. Для каждого списка берутся '
+            'запросы представлений: первая страница и страница по курсору '
+            'из конца списка.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Сколько раз выполнить каждый запрос для замера времени.')
+
+    def get_pages(self, name, paginator):
+        yield name, paginator.page_queryset(None)
+        last = paginator.queryset.order_by(*paginator.ordering).last()
+        if last is not None:
+            position = paginator.decode_cursor(
+                paginator.encode_cursor(last, NEXT))
+            yield f'{name} (курсор)', paginator.page_queryset(position)
+
+    def get_queries(self):
+        category = Category.objects.order_by('pk').first()
+        author = get_user_model().objects.order_by('pk').first()
+        post = Post.objects.order_by('-comment_count').first()
+        tag = Tag.objects.order_by('pk').first()
+        yield from self.get_pages('feed', CursorPaginator(
+            filtered_posts_queryset(), SHOWED_ITEMS))
+        if category:
+            yield from self.get_pages('category', CursorPaginator(
+                filtered_posts_queryset(category.category_posts),
+                SHOWED_ITEMS))
+        if author:
+            yield from self.get_pages('profile', CursorPaginator(
+                filtered_posts_queryset(author.author_posts), SHOWED_ITEMS))
+        if post:
+            yield from self.get_pages('comments', comments_paginator(post))
+        if tag:
+            yield 'tag', Tag.objects.filter(slug=tag.slug)
+
+    def handle(self, *args, **options):
+        for name, queryset in self.get_queries():
+            started = perf_counter()
+            for _ in range(options['repeat']):
+                list(queryset.all())
+            elapsed = (perf_counter() - started) / options['repeat'] * 1000
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{name}: {elapsed:.2f} мс'))
+            self.stdout.write(queryset.explain())
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from blog.models import Post
+from blog.search import rebuild_index, search_available
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс публикаций.'
+
+    def handle(self, *args, **options):
+        if not search_available():
+            raise CommandError(
+                'Полнотекстовый индекс поддерживается только для SQLite.')
+        with transaction.atomic():
+            rebuild_index()
+        self.stdout.write(self.style.SUCCESS(
+            f'Проиндексировано публикаций: {Post.objects.count()}'))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from blog.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сохранённое количество комментариев у публикаций.'
+
+    def handle(self, *args, **options):
+        actual_count = Comment.objects.filter(
+            post=OuterRef('pk')
+        ).order_by().values('post').annotate(
+            total=Count('pk')
+        ).values('total')
+        with transaction.atomic():
+            updated = Post.objects.update(comment_count=Coalesce(
+                Subquery(actual_count, output_field=IntegerField()), 0))
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано публикаций: {updated}'))
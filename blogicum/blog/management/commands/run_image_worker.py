@@ -0,0 +1,23 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from blog.image_jobs import run_worker
+
+
+class Command(BaseCommand):
+    help = ('Обрабатывает очередь картинок публикаций: поворот по EXIF, '
+            'перекодирование и уменьшенные копии.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=os.cpu_count() or 1,
+            help='Размер пула процессов; 0 — обрабатывать в этом процессе.')
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Завершиться, когда очередь опустеет.')
+        parser.add_argument('--poll-interval', type=float, default=1.0)
+
+    def handle(self, *args, **options):
+        run_worker(options['processes'], options['once'],
+                   options['poll_interval'])
@@ -0,0 +1,212 @@
+import random
+from array import array
+from collections import Counter
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from faker import Faker
+
+from blog.models import Category, Comment, Location, Post, Tag
+from blog.search import rebuild_index, search_available
+
+SENTENCE_POOL_SIZE = 2000
+PUB_DATE_SPREAD = timedelta(days=3 * 365)
+DEFERRED_SPREAD = timedelta(days=30)
+
+
+def zipf_cum_weights(size, exponent):
+    return list(accumulate(
+        1 / rank ** exponent for rank in range(1, size + 1)))
+
+
+def chunks(total, size):
+    for start in range(0, total, size):
+        yield start, min(size, total - start)
+
+
+class Command(BaseCommand):
+    help = ('Заполняет базу синтетическими данными: пользователи, '
+            'категории, местоположения, теги, публикации и комментарии.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=50)
+        parser.add_argument('--locations', type=int, default=200)
+        parser.add_argument('--tags', type=int, default=500)
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument('--comments', type=int, default=300000)
+        parser.add_argument('--max-tags-per-post', type=int, default=4)
+        parser.add_argument(
+            '--zipf', type=float, default=1.1,
+            help='Показатель распределения Ципфа для авторов, тегов и '
+                 'комментируемых публикаций.')
+        parser.add_argument(
+            '--deferred-share', type=float, default=0.02,
+            help='Доля отложенных публикаций.')
+        parser.add_argument(
+            '--unpublished-share', type=float, default=0.05,
+            help='Доля снятых с публикации постов и категорий.')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.random = random.Random(options['seed'])
+        self.faker = Faker('ru_RU')
+        self.faker.seed_instance(options['seed'])
+        self.sentences = [self.faker.sentence()
+                          for _ in range(SENTENCE_POOL_SIZE)]
+        self.now = timezone.now()
+
+        user_ids = self.create_users()
+        categories = self.create_categories()
+        location_ids = self.create_locations()
+        tag_ids = self.create_tags()
+        post_ids = self.create_posts(user_ids, categories, location_ids)
+        self.create_post_tags(post_ids, tag_ids)
+        self.create_comments(post_ids, user_ids)
+        if search_available():
+            self.stdout.write('Перестройка поискового индекса...')
+            with transaction.atomic():
+                rebuild_index()
+        cache.clear()
+        self.stdout.write(self.style.SUCCESS('Готово.'))
+
+    def bulk_create(self, model, objects):
+        with transaction.atomic():
+            model.objects.bulk_create(
+                objects, batch_size=self.options['batch_size'])
+
+    def new_ids(self, model, last_id):
+        return list(model.objects.filter(pk__gt=last_id).order_by(
+            'pk').values_list('pk', flat=True))
+
+    def last_id(self, model):
+        return model.objects.order_by('-pk').values_list(
+            'pk', flat=True).first() or 0
+
+    def text(self, sentences):
+        return ' '.join(self.random.choices(self.sentences, k=sentences))
+
+    def is_unpublished(self):
+        return self.random.random() < self.options['unpublished_share']
+
+    def create_users(self):
+        User = get_user_model()
+        last_id = self.last_id(User)
+        password = make_password(None)
+        for start, size in chunks(self.options['users'],
+                                  self.options['batch_size']):
+            self.bulk_create(User, [
+                User(username=f'{self.faker.user_name()}_{last_id}_{i}',
+                     first_name=self.faker.first_name(),
+                     last_name=self.faker.last_name(),
+                     password=password)
+                for i in range(start, start + size)])
+        self.stdout.write(f'Пользователей: {self.options["users"]}')
+        return self.new_ids(User, last_id)
+
+    def create_categories(self):
+        last_id = self.last_id(Category)
+        self.bulk_create(Category, [
+            Category(title=self.faker.word().capitalize(),
+                     description=self.text(2),
+                     slug=f'seed-{last_id}-{i}',
+                     is_published=not self.is_unpublished())
+            for i in range(self.options['categories'])])
+        self.stdout.write(f'Категорий: {self.options["categories"]}')
+        return list(Category.objects.filter(pk__gt=last_id).order_by(
+            'pk').values_list('pk', 'is_published'))
+
+    def create_locations(self):
+        last_id = self.last_id(Location)
+        self.bulk_create(Location, [
+            Location(name=self.faker.city(),
+                     is_published=not self.is_unpublished())
+            for _ in range(self.options['locations'])])
+        self.stdout.write(f'Местоположений: {self.options["locations"]}')
+        return self.new_ids(Location, last_id)
+
+    def create_tags(self):
+        last_id = self.last_id(Tag)
+        self.bulk_create(Tag, [
+            Tag(tag=self.faker.word()[:12], slug=f'seed-{last_id}-{i}')
+            for i in range(self.options['tags'])])
+        self.stdout.write(f'Тегов: {self.options["tags"]}')
+        return self.new_ids(Tag, last_id)
+
+    def create_posts(self, user_ids, categories, location_ids):
+        total = self.options['posts']
+        self.comment_posts = array('l', self.random.choices(
+            range(total),
+            cum_weights=zipf_cum_weights(total, self.options['zipf']),
+            k=self.options['comments']))
+        comment_counts = Counter(self.comment_posts)
+        author_weights = zipf_cum_weights(
+            len(user_ids), self.options['zipf'])
+        last_id = self.last_id(Post)
+        for start, size in chunks(total, self.options['batch_size']):
+            authors = self.random.choices(
+                user_ids, cum_weights=author_weights, k=size)
+            posts = []
+            for offset, author_id in enumerate(authors):
+                category_id, category_published = self.random.choice(
+                    categories)
+                if self.random.random() < self.options['deferred_share']:
+                    pub_date = self.now + self.random.random() * (
+                        DEFERRED_SPREAD)
+                else:
+                    pub_date = self.now - self.random.random() * (
+                        PUB_DATE_SPREAD)
+                is_published = not self.is_unpublished()
+                posts.append(Post(
+                    title=self.random.choice(self.sentences)[:256],
+                    text=self.text(self.random.randint(3, 12)),
+                    pub_date=pub_date,
+                    author_id=author_id,
+                    category_id=category_id,
+                    location_id=self.random.choice(location_ids + [None]),
+                    is_published=is_published,
+                    is_visible=(is_published and category_published
+                                and pub_date <= self.now),
+                    comment_count=comment_counts[start + offset]))
+            self.bulk_create(Post, posts)
+            self.stdout.write(f'Публикаций: {start + size}/{total}')
+        return self.new_ids(Post, last_id)
+
+    def create_post_tags(self, post_ids, tag_ids):
+        PostTag = Post.tags.through
+        tag_weights = zipf_cum_weights(len(tag_ids), self.options['zipf'])
+        links = 0
+        for start, size in chunks(len(post_ids), self.options['batch_size']):
+            batch = []
+            for post_id in post_ids[start:start + size]:
+                count = self.random.randint(
+                    0, self.options['max_tags_per_post'])
+                for tag_id in set(self.random.choices(
+                        tag_ids, cum_weights=tag_weights, k=count)):
+                    batch.append(PostTag(post_id=post_id, tag_id=tag_id))
+            self.bulk_create(PostTag, batch)
+            links += len(batch)
+        self.stdout.write(f'Связей публикаций с тегами: {links}')
+
+    def create_comments(self, post_ids, user_ids):
+        total = len(self.comment_posts)
+        author_weights = zipf_cum_weights(
+            len(user_ids), self.options['zipf'])
+        for start, size in chunks(total, self.options['batch_size']):
+            authors = self.random.choices(
+                user_ids, cum_weights=author_weights, k=size)
+            self.bulk_create(Comment, [
+                Comment(text=self.text(self.random.randint(1, 3)),
+                        post_id=post_ids[post_index],
+                        author_id=author_id)
+                for post_index, author_id in zip(
+                    self.comment_posts[start:start + size], authors)])
+            self.stdout.write(f'Комментариев: {start + size}/{total}')
@@ -0,0 +1,219 @@
+import json
+import os
+import threading
+import weakref
+from bisect import bisect_left
+from collections import defaultdict, deque
+from pathlib import Path
+from time import monotonic
+
+from .constants import METRICS_FLUSH_INTERVAL, METRICS_LATENCY_BUCKETS
+
+COUNTER, GAUGE, HISTOGRAM = 'counter', 'gauge', 'histogram'
+
+METRICS = {
+    'blog_http_requests_total': (
+        COUNTER, 'HTTP-запросы по view, методу и статусу ответа.'),
+    'blog_http_request_duration_seconds': (
+        HISTOGRAM, 'Время ответа по view.'),
+    'blog_http_requests_in_flight': (
+        GAUGE, 'Запросы, обрабатываемые прямо сейчас.'),
+    'blog_db_queries_total': (COUNTER, 'SQL-запросы по view.'),
+    'blog_cache_hits_total': (COUNTER, 'Попадания в кэш по слою.'),
+    'blog_cache_misses_total': (COUNTER, 'Промахи кэша по слою.'),
+    'blog_writes_total': (
+        COUNTER, 'Созданные, изменённые и удалённые публикации и '
+                 'комментарии.'),
+}
+
+
+def label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+class MetricsShard:
+    """Значения одного потока: пишет в шард только его поток, поэтому
+    блокировки не нужны."""
+
+    def __init__(self, buckets):
+        self.values = defaultdict(float)
+        self.histograms = defaultdict(lambda: [0] * (len(buckets) + 1))
+        self.sums = defaultdict(float)
+
+    def add_to(self, target):
+        for key, value in self.values.copy().items():
+            target['values'][key] += value
+        for key, counts in self.histograms.copy().items():
+            total = target['histograms'].setdefault(key, [0] * len(counts))
+            for index, count in enumerate(counts):
+                total[index] += count
+        for key, value in self.sums.copy().items():
+            target['sums'][key] += value
+
+
+class MetricsRegistry:
+    def __init__(self, buckets=METRICS_LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.shards = []
+        self.finished = deque()
+        self.retired = {'values': defaultdict(float), 'histograms': {},
+                        'sums': defaultdict(float)}
+        self.flushed = 0.0
+
+    @property
+    def shard(self):
+        shard = getattr(self.local, 'shard', None)
+        if shard is None:
+            shard = self.local.shard = MetricsShard(self.buckets)
+            with self.lock:
+                self.shards.append(shard)
+            # Сервер может заводить поток на каждое соединение: значения
+            # завершившегося потока переносятся в общий итог.
+            weakref.finalize(threading.current_thread(), self.retire, shard)
+        return shard
+
+    def retire(self, shard):
+        # Финализатор может сработать при сборке мусора внутри snapshot()
+        # в том же потоке, поэтому блокировку здесь не берём: шард
+        # переносится в итог при следующем snapshot().
+        self.finished.append(shard)
+
+    def inc(self, name, value=1, **labels):
+        self.shard.values[name, label_key(labels)] += value
+
+    def dec(self, name, value=1, **labels):
+        self.inc(name, -value, **labels)
+
+    def observe(self, name, value, **labels):
+        shard, key = self.shard, (name, label_key(labels))
+        shard.histograms[key][bisect_left(self.buckets, value)] += 1
+        shard.sums[key] += value
+
+    def snapshot(self):
+        with self.lock:
+            while self.finished:
+                shard = self.finished.popleft()
+                shard.add_to(self.retired)
+                self.shards.remove(shard)
+            snapshot = merge_snapshots([self.retired])
+            for shard in self.shards:
+                shard.add_to(snapshot)
+        return snapshot
+
+    def flush(self, directory, force=False):
+        """Сохраняет снимок процесса в общий каталог, не чаще раза в
+        METRICS_FLUSH_INTERVAL секунд."""
+        now = monotonic()
+        if not force and now - self.flushed < METRICS_FLUSH_INTERVAL:
+            return
+        self.flushed = now
+        path = Path(directory) / f'metrics-{os.getpid()}.json'
+        temporary = path.with_suffix('.tmp')
+        temporary.write_text(json.dumps(dump_snapshot(self.snapshot())))
+        os.replace(temporary, path)
+
+    def collect(self, directory=None):
+        snapshots = [self.snapshot()]
+        if directory:
+            self.flush(directory, force=True)
+            for path in Path(directory).glob('metrics-*.json'):
+                pid = int(path.stem.split('-')[1])
+                if pid == os.getpid():
+                    continue
+                snapshot = load_snapshot(json.loads(path.read_text()))
+                if not process_alive(pid):
+                    snapshot['values'] = {
+                        key: value
+                        for key, value in snapshot['values'].items()
+                        if METRICS[key[0]][0] != GAUGE}
+                snapshots.append(snapshot)
+        return merge_snapshots(snapshots)
+
+
+def process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def dump_snapshot(snapshot):
+    return {
+        part: [[name, labels, value]
+               for (name, labels), value in values.items()]
+        for part, values in snapshot.items()}
+
+
+def load_snapshot(data):
+    return {
+        part: {(name, tuple(map(tuple, labels))): value
+               for name, labels, value in values}
+        for part, values in data.items()}
+
+
+def merge_snapshots(snapshots):
+    merged = {'values': defaultdict(float), 'histograms': {},
+              'sums': defaultdict(float)}
+    for snapshot in snapshots:
+        for key, value in snapshot['values'].items():
+            merged['values'][key] += value
+        for key, value in snapshot['sums'].items():
+            merged['sums'][key] += value
+        for key, counts in snapshot['histograms'].items():
+            total = merged['histograms'].setdefault(key, [0] * len(counts))
+            for index, count in enumerate(counts):
+                total[index] += count
+    return merged
+
+
+def escape(value):
+    return (str(value).replace('\\', '\\\\').replace('"', '\\"')
+            .replace('\n', '\\n'))
+
+
+def format_labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ''
+    return '{' + ','.join(
+        f'{name}="{escape(value)}"' for name, value in pairs) + '}'
+
+
+def format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+def render(snapshot, buckets=METRICS_LATENCY_BUCKETS):
+    """Текстовый формат экспозиции Prometheus 0.0.4."""
+    lines = []
+    for name, (kind, help_text) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        if kind == HISTOGRAM:
+            for key, counts in sorted(snapshot['histograms'].items()):
+                if key[0] != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip((*buckets, '+Inf'), counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket'
+                                 f'{format_labels(key[1], le=bound)} '
+                                 f'{cumulative}')
+                lines.append(f'{name}_sum{format_labels(key[1])} '
+                             f'{format_value(snapshot["sums"][key])}')
+                lines.append(f'{name}_count{format_labels(key[1])} '
+                             f'{cumulative}')
+            continue
+        for key, value in sorted(snapshot['values'].items()):
+            if key[0] == name:
+                lines.append(
+                    f'{name}{format_labels(key[1])} {format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,325 @@
+import json
+import logging
+from hashlib import md5
+from pathlib import Path
+from random import random
+from time import perf_counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.paginator import Page
+from django.db import connection
+from django.db.models import QuerySet
+from django.http import HttpResponse
+from django.urls import resolve
+from django.utils import timezone
+
+from .budgets import get_budget, recorder
+from .caching import (page_dependency_key, page_dependency_versions,
+                      post_dependencies)
+from .constants import (PAGE_CACHE_TIMEOUT, PROFILE_COOKIE,
+                        PROFILE_QUERY_PARAM)
+from .instrumentation import collect_query_stats
+from .metrics import registry
+from .models import Category, Comment, Post, Tag
+from .paginators import CursorPage
+from .profiling import profile, record_queries
+from .request_profiler import PROFILERS
+from .scheduler import publish_due_posts
+from .timing import RequestTimings, current_timings
+from .watchdog import watchdog
+
+access_logger = logging.getLogger('blog.access')
+
+CACHED_VIEWS = {
+    'blog:index',
+    'blog:post_detail',
+    'blog:profile',
+    'blog:category_posts',
+    'blog:tag',
+}
+FEED_VIEWS = {'blog:index'}
+
+
+def page_cache_key(request):
+    url = md5(request.build_absolute_uri().encode()).hexdigest()
+    return f'blog:page:{url}'
+
+
+def collect_dependencies(value, dependencies):
+    if isinstance(value, Post):
+        dependencies.update(post_dependencies(value))
+    elif isinstance(value, Comment):
+        dependencies.add(f'author:{value.author_id}')
+    elif isinstance(value, Category):
+        dependencies.add(f'category:{value.pk}')
+    elif isinstance(value, Tag):
+        dependencies.add(f'tag:{value.pk}')
+    elif isinstance(value, get_user_model()):
+        dependencies.add(f'author:{value.pk}')
+    elif isinstance(value, (Page, CursorPage)):
+        for item in value:
+            collect_dependencies(item, dependencies)
+    elif isinstance(value, QuerySet) and value._result_cache is not None:
+        for item in value._result_cache:
+            collect_dependencies(item, dependencies)
+
+
+class AnonymousPageCacheMiddleware:
+    """Кэширует страницы ленты для анонимных посетителей.
+
+    Каждая запись помнит версии зависимостей (публикаций, категорий,
+    тегов, авторов), сигналы увеличивают версии при сохранении моделей.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if (request.method not in ('GET', 'HEAD')
+                or request.user.is_authenticated):
+            return self.get_response(request)
+        key = page_cache_key(request)
+        response = self.get_cached_response(key)
+        if response is not None:
+            request.resolver_match = resolve(request.path_info)
+            return response
+        response = self.get_response(request)
+        self.cache_response(key, request, response)
+        return response
+
+    def get_cached_response(self, key):
+        entry = cache.get(key)
+        if entry is None:
+            return None
+        versions = cache.get_many([
+            page_dependency_key(dependency)
+            for dependency in entry['dependencies']])
+        for dependency, version in entry['dependencies'].items():
+            if versions.get(page_dependency_key(dependency)) != version:
+                return None
+        return HttpResponse(entry['content'],
+                            content_type=entry['content_type'])
+
+    def cache_response(self, key, request, response):
+        dependencies = getattr(request, 'page_cache_dependencies', None)
+        if (dependencies is None
+                or response.status_code != 200
+                or response.streaming
+                or response.cookies):
+            return
+        cache.set(key, {
+            'content': response.content,
+            'content_type': response['Content-Type'],
+            'dependencies': page_dependency_versions(dependencies),
+        }, PAGE_CACHE_TIMEOUT)
+
+    def process_template_response(self, request, response):
+        view_name = getattr(request.resolver_match, 'view_name', None)
+        if (view_name not in CACHED_VIEWS
+                or request.GET.get('q')
+                or request.user.is_authenticated):
+            return response
+        dependencies = {'feed'} if view_name in FEED_VIEWS else set()
+        for value in (response.context_data or {}).values():
+            collect_dependencies(value, dependencies)
+        request.page_cache_dependencies = dependencies
+        return response
+
+
+class PublicationSchedulerMiddleware:
+    """Открывает отложенные публикации, как только наступает их время."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        publish_due_posts()
+        return self.get_response(request)
+
+
+class ViewBudgetMiddleware:
+    """Сверяет запросы, строки и время ответа view с его бюджетом."""
+
+    def __init__(self, get_response):
+        if not settings.BLOG_RECORD_VIEW_BUDGETS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = perf_counter()
+        with collect_query_stats() as stats:
+            response = self.get_response(request)
+        duration_ms = (perf_counter() - started) * 1000
+        view_name = getattr(request.resolver_match, 'view_name', None)
+        budget = get_budget(
+            view_name, getattr(request, 'user', None) is not None
+            and request.user.is_authenticated)
+        if budget is not None:
+            recorder.record(view_name, budget, stats.queries, stats.rows,
+                            duration_ms)
+        return response
+
+
+class SQLProfilingMiddleware:
+    """Собирает шаблоны SQL-запросов у случайной доли запросов."""
+
+    def __init__(self, get_response):
+        if not settings.BLOG_SQL_PROFILE_SAMPLE_RATE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random() >= settings.BLOG_SQL_PROFILE_SAMPLE_RATE:
+            return self.get_response(request)
+        with record_queries(profile):
+            return self.get_response(request)
+
+
+class ServerTimingMiddleware:
+    """Добавляет заголовок Server-Timing с временем БД, шаблонов, кэша и
+    view и пишет ту же разбивку в JSON-строку журнала blog.access.
+
+    view — всё время обработки, кроме отрисовки TemplateResponse; запросы
+    ленивых queryset при отрисовке входят и в db, и в tpl.
+    """
+
+    def __init__(self, get_response):
+        if not settings.BLOG_SERVER_TIMING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = request.timings = RequestTimings()
+        token = current_timings.set(timings)
+        try:
+            with collect_query_stats() as stats:
+                response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        timings.db, timings.db_queries = stats.duration, stats.queries
+        response['Server-Timing'] = timings.server_timing()
+        access_logger.info(json.dumps(
+            self.access_record(request, response, timings),
+            ensure_ascii=False))
+        return response
+
+    def process_template_response(self, request, response):
+        render = response.render
+
+        def timed_render():
+            started = perf_counter()
+            try:
+                return render()
+            finally:
+                request.timings.template += perf_counter() - started
+
+        response.render = timed_render
+        return response
+
+    def access_record(self, request, response, timings):
+        user = getattr(request, 'user', None)
+        return {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'view': getattr(request.resolver_match, 'view_name', None),
+            'user_id': user.pk if user is not None else None,
+            'duration_ms': round(timings.total * 1000, 2),
+            'db_ms': round(timings.db * 1000, 2),
+            'db_queries': timings.db_queries,
+            'template_ms': round(timings.template * 1000, 2),
+            'cache_ms': round(timings.cache * 1000, 2),
+            'cache_hits': timings.cache_hits,
+            'cache_misses': timings.cache_misses,
+        }
+
+
+class MetricsMiddleware:
+    """Считает запросы, время ответа и SQL-запросы по view для /metrics."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        registry.inc('blog_http_requests_in_flight')
+        started = perf_counter()
+        try:
+            with collect_query_stats() as stats:
+                response = self.get_response(request)
+        finally:
+            registry.dec('blog_http_requests_in_flight')
+        view = getattr(request.resolver_match, 'view_name', None) or (
+            'unresolved')
+        registry.inc('blog_http_requests_total', view=view,
+                     method=request.method, status=response.status_code)
+        registry.observe('blog_http_request_duration_seconds',
+                         perf_counter() - started, view=view)
+        registry.inc('blog_db_queries_total', stats.queries, view=view)
+        if settings.BLOG_METRICS_DIR:
+            registry.flush(settings.BLOG_METRICS_DIR)
+        return response
+
+
+class SlowRequestWatchdogMiddleware:
+    """Снимает стеки запросов дольше BLOG_SLOW_REQUEST_THRESHOLD секунд
+    и пишет их в журнал blog.slow_requests вместе с URL, классом view и
+    выполненным SQL."""
+
+    def __init__(self, get_response):
+        if not settings.BLOG_SLOW_REQUEST_THRESHOLD:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        watchdog.threshold = settings.BLOG_SLOW_REQUEST_THRESHOLD
+        watchdog.start()
+
+    def __call__(self, request):
+        with watchdog.watch(request) as watched:
+            request.watched_request = watched
+            with connection.execute_wrapper(watched):
+                return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.watched_request.view_class = getattr(
+            view_func, 'view_class', view_func).__name__
+
+
+class OnDemandProfilerMiddleware:
+    """Профилирует запрос сотрудника с `?profile=sample|trace` или cookie
+    blog_profile и отдаёт стеки в формате collapsed для flamegraph.
+
+    Если задан BLOG_PROFILE_DIR, профиль сохраняется туда, а в ответе
+    остаётся страница с заголовком X-Profile. Остальные запросы проходят
+    без профилировщика.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = (request.GET.get(PROFILE_QUERY_PARAM)
+                or request.COOKIES.get(PROFILE_COOKIE))
+        if mode is None or not request.user.is_staff:
+            return self.get_response(request)
+        profiler_class = PROFILERS.get(mode, PROFILERS['sample'])
+        with profiler_class() as profiler:
+            response = self.get_response(request)
+        view_name = getattr(request.resolver_match, 'view_name', None)
+        filename = '{}-{}-{}.folded'.format(
+            timezone.now().strftime('%Y%m%d-%H%M%S-%f'),
+            (view_name or 'unresolved').replace(':', '-'),
+            profiler_class.unit)
+        if settings.BLOG_PROFILE_DIR:
+            directory = Path(settings.BLOG_PROFILE_DIR)
+            directory.mkdir(parents=True, exist_ok=True)
+            (directory / filename).write_text(profiler.folded())
+            response['X-Profile'] = filename
+            return response
+        profile_response = HttpResponse(
+            profiler.folded(), content_type='text/plain; charset=utf-8')
+        profile_response['Content-Disposition'] = (
+            f'inline; filename="{filename}"')
+        profile_response['X-Profiled-Status'] = response.status_code
+        return profile_response
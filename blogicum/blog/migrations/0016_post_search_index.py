@@ -0,0 +1,39 @@
+# Generated by Django 3.2.16 on 2026-10-17 12:00
+
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS blog_post_fts USING fts5("
+        "title, text, tags, category, "
+        "tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    schema_editor.execute(
+        "INSERT INTO blog_post_fts (rowid, title, text, tags, category) "
+        "SELECT post.id, post.title, post.text, "
+        "COALESCE((SELECT group_concat(tag.tag, ' ') FROM blog_tag tag "
+        "JOIN blog_post_tags link ON link.tag_id = tag.id "
+        "WHERE link.post_id = post.id), ''), "
+        "COALESCE(category.title, '') "
+        "FROM blog_post post "
+        "LEFT JOIN blog_category category ON category.id = post.category_id"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS blog_post_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_post_comment_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
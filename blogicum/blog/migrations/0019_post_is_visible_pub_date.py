@@ -0,0 +1,27 @@
+# Generated by Django 3.2.16 on 2026-10-17 21:13
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def hide_scheduled_posts(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.filter(
+        pub_date__gt=timezone.now()
+    ).update(is_visible=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0018_post_is_visible'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='is_visible',
+            field=models.BooleanField(default=False, editable=False, help_text='Публикация и её категория опубликованы, а время публикации наступило.', verbose_name='Видна читателям'),
+        ),
+        migrations.RunPython(hide_scheduled_posts, migrations.RunPython.noop),
+    ]
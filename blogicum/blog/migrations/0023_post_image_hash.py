@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-17 21:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0022_post_image_content_addressed_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_hash',
+            field=models.CharField(blank=True, editable=False, max_length=16, verbose_name='Перцептивный хеш картинки'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 3.2.16 on 2026-10-17 22:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_image_hashes(apps, schema_editor):
+    # Разбиение повторено здесь, чтобы миграция не зависела от кода
+    # приложения: 64-битный хеш делится на четыре части по 16 бит.
+    ImageHash = apps.get_model('blog', 'ImageHash')
+    Post = apps.get_model('blog', 'Post')
+    posts = Post.objects.exclude(image_hash='').values_list(
+        'pk', 'image_hash')
+    ImageHash.objects.bulk_create(
+        (ImageHash(post_id=pk, value=image_hash, **{
+            f'band_{band}': int(image_hash, 16) >> (band * 16) & 0xffff
+            for band in range(4)})
+         for pk, image_hash in posts.iterator()),
+        batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0023_post_image_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageHash',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='image_hash_index', serialize=False, to='blog.post', verbose_name='Публикация')),
+                ('value', models.CharField(max_length=16, verbose_name='Хеш')),
+                ('band_0', models.PositiveIntegerField(verbose_name='Часть 1')),
+                ('band_1', models.PositiveIntegerField(verbose_name='Часть 2')),
+                ('band_2', models.PositiveIntegerField(verbose_name='Часть 3')),
+                ('band_3', models.PositiveIntegerField(verbose_name='Часть 4')),
+                ('cluster', models.BigIntegerField(help_text='Наименьший id публикации в группе.', null=True, verbose_name='Группа похожих картинок')),
+            ],
+            options={
+                'verbose_name': 'перцептивный хеш картинки',
+                'verbose_name_plural': 'Перцептивные хеши картинок',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='imagehash',
+            index=models.Index(fields=['band_0'], name='image_hash_band_0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='imagehash',
+            index=models.Index(fields=['band_1'], name='image_hash_band_1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='imagehash',
+            index=models.Index(fields=['band_2'], name='image_hash_band_2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='imagehash',
+            index=models.Index(fields=['band_3'], name='image_hash_band_3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='imagehash',
+            index=models.Index(condition=models.Q(('cluster__isnull', False)), fields=['cluster'], name='image_hash_cluster_idx'),
+        ),
+        migrations.RunPython(fill_image_hashes, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,9 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models import Q
 
-from .constants import CHARACTERS_COUNT
+from .constants import CHARACTERS_COUNT, IMAGE_HASH_BANDS
+from .storage import ContentAddressedStorage
 
 
 class BaseModel(models.Model):
@@ -64,7 +66,7 @@ class Location(BaseModel):
 
 class Tag(models.Model):
     tag = models.CharField(max_length=20, verbose_name='Тег')
-    slug = models.SlugField(max_length=20, verbose_name='Слаг')
+    slug = models.SlugField(max_length=20, unique=True, verbose_name='Слаг')
 
     class Meta:
         ordering = ('tag',)
@@ -105,15 +107,49 @@ class Post(BaseModel, CommonInfoBaseModel):
     )
     image = models.ImageField(blank=True,
                               upload_to='posts_images',
+                              storage=ContentAddressedStorage(),
                               verbose_name='Картинка')
+    image_derivatives = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name='Уменьшенные копии картинки'
+    )
+    image_hash = models.CharField(
+        max_length=16,
+        blank=True,
+        editable=False,
+        verbose_name='Перцептивный хеш картинки'
+    )
     tags = models.ManyToManyField(Tag, verbose_name='Теги', blank=True,
                                   help_text='''Удерживайте Ctrl
                                   для выбора нескольких вариантов.''')
+    is_visible = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Видна читателям',
+        help_text='Публикация и её категория опубликованы, '
+        'а время публикации наступило.'
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев'
+    )
 
     class Meta:
         ordering = ('-pub_date',)
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
+        indexes = (
+            models.Index(fields=('-pub_date', '-id'),
+                         condition=Q(is_visible=True),
+                         name='post_visible_pub_date_idx'),
+            models.Index(fields=('category', '-pub_date', '-id'),
+                         name='post_category_pub_date_idx'),
+            models.Index(fields=('author', '-pub_date', '-id'),
+                         name='post_author_pub_date_idx'),
+        )
 
     def __str__(self):
         return self.title
@@ -134,6 +170,93 @@ class Comment(models.Model):
         ordering = ('created_at',)
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = (
+            models.Index(fields=('post', 'created_at'),
+                         name='comment_post_created_at_idx'),
+        )
 
     def __str__(self):
         return self.text
+
+
+class ImageJob(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Готово'),
+        (FAILED, 'Ошибка'),
+    )
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='image_jobs',
+        verbose_name='Публикация'
+    )
+    source = models.CharField(max_length=CHARACTERS_COUNT,
+                              verbose_name='Картинка')
+    status = models.CharField(max_length=16, choices=STATUSES,
+                              default=PENDING, verbose_name='Статус')
+    attempts = models.PositiveSmallIntegerField(default=0,
+                                                verbose_name='Попытки')
+    error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+    created_at = models.DateTimeField(auto_now_add=True,
+                                      verbose_name='Добавлено')
+    started_at = models.DateTimeField(null=True, blank=True,
+                                      verbose_name='Начато')
+    finished_at = models.DateTimeField(null=True, blank=True,
+                                       verbose_name='Завершено')
+
+    class Meta:
+        ordering = ('created_at',)
+        verbose_name = 'обработка картинки'
+        verbose_name_plural = 'Обработка картинок'
+        indexes = (
+            models.Index(fields=('status', 'created_at'),
+                         name='image_job_status_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.source} ({self.get_status_display()})'
+
+
+class ImageHash(models.Model):
+    """Перцептивный хеш картинки публикации, разбитый на части для поиска
+    похожих картинок по точным совпадениям частей (multi-index hashing)."""
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='image_hash_index',
+        verbose_name='Публикация'
+    )
+    value = models.CharField(max_length=16, verbose_name='Хеш')
+    band_0 = models.PositiveIntegerField(verbose_name='Часть 1')
+    band_1 = models.PositiveIntegerField(verbose_name='Часть 2')
+    band_2 = models.PositiveIntegerField(verbose_name='Часть 3')
+    band_3 = models.PositiveIntegerField(verbose_name='Часть 4')
+    cluster = models.BigIntegerField(
+        null=True,
+        verbose_name='Группа похожих картинок',
+        help_text='Наименьший id публикации в группе.'
+    )
+
+    class Meta:
+        verbose_name = 'перцептивный хеш картинки'
+        verbose_name_plural = 'Перцептивные хеши картинок'
+        indexes = (
+            *(models.Index(fields=(f'band_{band}',),
+                           name=f'image_hash_band_{band}_idx')
+              for band in range(IMAGE_HASH_BANDS)),
+            models.Index(fields=('cluster',),
+                         condition=Q(cluster__isnull=False),
+                         name='image_hash_cluster_idx'),
+        )
+
+    def __str__(self):
+        return self.value
@@ -0,0 +1,117 @@
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+NEXT = 'next'
+PREVIOUS = 'previous'
+START = 'start'
+MAX_PK = 2 ** 63 - 1
+
+
+class CursorPage:
+    cursor_paginated = True
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self.object_list)} items>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Keyset-пагинатор по паре (key_field, pk) без COUNT(*) и OFFSET."""
+
+    def __init__(self, queryset, per_page, key_field='pub_date',
+                 descending=True):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.key_field = key_field
+        self.descending = descending
+
+    @property
+    def ordering(self):
+        prefix = '-' if self.descending else ''
+        return (f'{prefix}{self.key_field}', f'{prefix}pk')
+
+    @property
+    def key(self):
+        return self.queryset.model._meta.get_field(self.key_field)
+
+    def encode_cursor(self, instance, direction):
+        position = [self.key.value_to_string(instance), instance.pk, direction]
+        return urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+    def decode_cursor(self, cursor):
+        if not cursor:
+            return None
+        try:
+            value, pk, direction = json.loads(urlsafe_b64decode(
+                cursor.encode()))
+            value = self.key.to_python(value)
+            pk = int(pk)
+        except (binascii.Error, OverflowError, TypeError, ValueError,
+                ValidationError):
+            return None
+        if (value is None or direction not in (NEXT, PREVIOUS, START)
+                or not -MAX_PK <= pk <= MAX_PK):
+            return None
+        return value, pk, direction
+
+    def page_queryset(self, position):
+        queryset = self.queryset.order_by(*self.ordering)
+        backwards = position is not None and position[2] == PREVIOUS
+        if position is not None:
+            value, pk = position[:2]
+            lookup = 'lt' if self.descending != backwards else 'gt'
+            pk_lookup = f'{lookup}e' if position[2] == START else lookup
+            # Отдельная граница по key_field делает запрос диапазонным
+            # чтением индекса (SEARCH), а не сканированием с начала.
+            queryset = queryset.filter(
+                **{f'{self.key_field}__{lookup}e': value}).filter(
+                Q(**{f'{self.key_field}__{lookup}': value})
+                | Q(**{self.key_field: value, f'pk__{pk_lookup}': pk}))
+        if backwards:
+            queryset = queryset.reverse()
+        return queryset[:self.per_page + 1]
+
+    def get_page(self, cursor=None):
+        position = self.decode_cursor(cursor)
+        backwards = position is not None and position[2] == PREVIOUS
+        object_list = list(self.page_queryset(position))
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[:self.per_page]
+        if backwards:
+            object_list.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, position is not None
+        next_cursor = previous_cursor = None
+        if object_list and has_next:
+            next_cursor = self.encode_cursor(object_list[-1], NEXT)
+        if object_list and has_previous:
+            previous_cursor = self.encode_cursor(object_list[0], PREVIOUS)
+        return CursorPage(object_list, self, next_cursor, previous_cursor)
@@ -0,0 +1,121 @@
+import re
+from contextlib import contextmanager
+from threading import Lock
+from time import perf_counter
+
+from django.db import connection
+
+from .constants import SQL_PROFILE_MAX_FINGERPRINTS
+from .instrumentation import RowCountingCursor
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r'(?<![\w."])-?\d+(?:\.\d+)?\b')
+PLACEHOLDER = re.compile(r'%s|\?')
+PLACEHOLDER_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+VALUES_LIST = re.compile(r'(\(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+')
+WHITESPACE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """Приводит SQL к шаблону: литералы и параметры заменяются на `?`,
+    списки параметров в IN и VALUES сворачиваются в `(...)`."""
+    sql = STRING_LITERAL.sub('?', sql)
+    sql = NUMBER_LITERAL.sub('?', sql)
+    sql = PLACEHOLDER.sub('?', sql)
+    sql = PLACEHOLDER_LIST.sub('(...)', sql)
+    sql = VALUES_LIST.sub(r'\1', sql)
+    return WHITESPACE.sub(' ', sql).strip()
+
+
+class QueryRecord:
+    def __init__(self, sql):
+        self.sql = sql
+        self.rows = 0
+        self.duration = 0.0
+
+
+class QueryRecorder:
+    """Запоминает все запросы одного HTTP-запроса; строки досчитываются
+    при чтении курсора, поэтому агрегируются записи после ответа."""
+
+    def __init__(self):
+        self.records = []
+
+    def __call__(self, execute, sql, params, many, context):
+        record = QueryRecord(sql)
+        self.records.append(record)
+        wrapper = context['cursor']
+        if not isinstance(wrapper.cursor, RowCountingCursor):
+            wrapper.cursor = RowCountingCursor(wrapper.cursor)
+        wrapper.cursor.attach(record, context)
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            record.duration = perf_counter() - started
+
+
+class FingerprintStats:
+    def __init__(self, sql):
+        self.sql = sql
+        self.calls = 0
+        self.rows = 0
+        self.duration = 0.0
+
+    @property
+    def mean_ms(self):
+        return self.duration * 1000 / self.calls
+
+    @property
+    def total_ms(self):
+        return self.duration * 1000
+
+
+class SQLProfile:
+    """Сводка по шаблонам запросов в памяти процесса, как
+    pg_stat_statements."""
+
+    def __init__(self, max_fingerprints=SQL_PROFILE_MAX_FINGERPRINTS):
+        self.max_fingerprints = max_fingerprints
+        self.lock = Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.stats = {}
+            self.requests = 0
+            self.dropped = 0
+
+    def add(self, records):
+        with self.lock:
+            self.requests += 1
+            for record in records:
+                key = fingerprint(record.sql)
+                stats = self.stats.get(key)
+                if stats is None:
+                    if len(self.stats) >= self.max_fingerprints:
+                        self.dropped += 1
+                        continue
+                    stats = self.stats[key] = FingerprintStats(key)
+                stats.calls += 1
+                stats.rows += record.rows
+                stats.duration += record.duration
+
+    def top(self, order_by='duration'):
+        with self.lock:
+            stats = list(self.stats.values())
+        return sorted(stats, key=lambda item: getattr(item, order_by),
+                      reverse=True)
+
+
+@contextmanager
+def record_queries(sql_profile):
+    recorder = QueryRecorder()
+    try:
+        with connection.execute_wrapper(recorder):
+            yield recorder
+    finally:
+        sql_profile.add(recorder.records)
+
+
+profile = SQLProfile()
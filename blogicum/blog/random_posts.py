@@ -0,0 +1,75 @@
+from array import array
+from random import choice, randint
+from threading import Lock
+from time import monotonic
+
+from django.db.models import Max, Min
+
+from .caching import bump_cache_version, cache_version
+from .models import Post
+
+RANDOM_POST_IDS_VERSION_KEY = 'blog:random_post_ids_version'
+# Не чаще раза в столько секунд процесс перечитывает список id после
+# изменений; устаревшие id отсеивает повторный выбор.
+RANDOM_POST_IDS_MIN_AGE = 10
+# Раз в столько секунд список перечитывается в любом случае: версия
+# пропадает вместе с кэшем.
+RANDOM_POST_IDS_MAX_AGE = 5 * 60
+RANDOM_POST_ATTEMPTS = 3
+
+
+def published_posts():
+    return Post.objects.filter(is_visible=True).order_by()
+
+
+class RandomPostIds:
+    """Массив id видимых публикаций в памяти процесса. Общий для всех
+    процессов номер версии в кэше сообщает, что список устарел."""
+
+    def __init__(self):
+        self.lock = Lock()
+        self.ids = None
+        self.version = None
+        self.loaded = 0.0
+
+    def get(self):
+        version = cache_version(RANDOM_POST_IDS_VERSION_KEY)
+        with self.lock:
+            age = monotonic() - self.loaded
+            if (self.ids is None or age >= RANDOM_POST_IDS_MAX_AGE
+                    or version != self.version
+                    and age >= RANDOM_POST_IDS_MIN_AGE):
+                self.ids = array('q', published_posts().values_list(
+                    'pk', flat=True))
+                self.version, self.loaded = version, monotonic()
+            return self.ids
+
+
+random_post_ids = RandomPostIds()
+
+
+def invalidate_random_post_ids():
+    bump_cache_version(RANDOM_POST_IDS_VERSION_KEY)
+
+
+def random_post_pk_by_range():
+    queryset = published_posts()
+    bounds = queryset.aggregate(low=Min('pk'), high=Max('pk'))
+    if bounds['low'] is None:
+        return None
+    return queryset.filter(
+        pk__gte=randint(bounds['low'], bounds['high'])
+    ).order_by('pk').values_list('pk', flat=True).first()
+
+
+def random_post(queryset):
+    """Случайная публикация из queryset или None. Если выпал id уже
+    удалённой или скрытой публикации, выбор повторяется, а затем
+    делается по диапазону id."""
+    ids = random_post_ids.get()
+    for _ in range(RANDOM_POST_ATTEMPTS if ids else 0):
+        post = queryset.filter(pk=choice(ids)).first()
+        if post is not None:
+            return post
+    pk = random_post_pk_by_range()
+    return None if pk is None else queryset.filter(pk=pk).first()
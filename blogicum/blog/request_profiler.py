@@ -0,0 +1,86 @@
+import sys
+import threading
+from collections import Counter
+from time import perf_counter
+
+from .constants import PROFILE_SAMPLE_INTERVAL
+from .watchdog import collapse_stack, frame_name
+
+
+class SamplingProfiler:
+    """Снимает стек потока запроса раз в `interval` секунд; вес стека —
+    число попавших в него выборок."""
+
+    unit = 'samples'
+
+    def __init__(self, interval=PROFILE_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.thread_id = threading.get_ident()
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(
+            target=self.run, name='request-profiler', daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[collapse_stack(frame)] += 1
+
+    def folded(self):
+        return ''.join(f'{stack} {count}\n'
+                       for stack, count in self.stacks.most_common())
+
+
+class TracingProfiler:
+    """Детерминированный профилировщик на sys.setprofile: вес стека —
+    собственное время его верхней функции в микросекундах."""
+
+    unit = 'microseconds'
+
+    def __init__(self):
+        self.stack = []
+        self.times = Counter()
+        self.last = None
+
+    def __enter__(self):
+        self.last = perf_counter()
+        sys.setprofile(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        sys.setprofile(None)
+
+    def __call__(self, frame, event, arg):
+        now = perf_counter()
+        if self.stack:
+            self.times[tuple(self.stack)] += now - self.last
+        if event == 'call':
+            self.stack.append(frame_name(frame))
+        elif event == 'c_call':
+            self.stack.append(
+                f'{getattr(arg, "__module__", None) or "builtins"}:'
+                f'{arg.__name__}')
+        elif self.stack:
+            self.stack.pop()
+        self.last = perf_counter()
+
+    def folded(self):
+        return ''.join(
+            f'{";".join(stack)} {round(duration * 1_000_000)}\n'
+            for stack, duration in self.times.most_common()
+            if duration >= 0.0000005)
+
+
+PROFILERS = {
+    'sample': SamplingProfiler,
+    'trace': TracingProfiler,
+}
@@ -0,0 +1,158 @@
+import os
+import posixpath
+import threading
+from hashlib import sha256
+from io import BytesIO
+from pathlib import Path
+from time import time_ns
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core import signing
+from django.urls import reverse
+from PIL import Image, ImageOps
+
+from .constants import (IMAGE_RESIZE_MAX_DIMENSION, RESIZED_CACHE_EVICT_RATIO,
+                        RESIZED_IMAGE_SIGNATURE_PARAM)
+from .models import Post
+from .storage import is_blob
+
+RESIZE_FORMATS = {
+    '.jpg': ('JPEG', 'image/jpeg'),
+    '.jpeg': ('JPEG', 'image/jpeg'),
+    '.png': ('PNG', 'image/png'),
+    '.webp': ('WEBP', 'image/webp'),
+}
+signer = signing.Signer(salt='blog.resized_images')
+
+
+def resize_signature(width, height, path):
+    return signer.signature(f'{width}x{height}/{path}')
+
+
+def resized_image_url(path, width, height):
+    url = reverse('resized_image', kwargs={
+        'width': width, 'height': height, 'path': path})
+    signature = resize_signature(width, height, path)
+    return f'{url}?{urlencode({RESIZED_IMAGE_SIGNATURE_PARAM: signature})}'
+
+
+def source_path(path):
+    """Путь к оригиналу внутри каталога картинок публикаций или None."""
+    path = posixpath.normpath(path)
+    upload_to = Post._meta.get_field('image').upload_to
+    if path.startswith(('/', '..')) or not path.startswith(upload_to + '/'):
+        return None
+    return Path(settings.MEDIA_ROOT) / path
+
+
+class ResizedImageCache:
+    """Дисковый кэш копий, разложенный по подкаталогам из первых символов
+    ключа. Время изменения файла обновляется при каждом попадании, и при
+    превышении `max_bytes` удаляются давно не запрошенные файлы."""
+
+    def __init__(self, directory, max_bytes):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.size = None
+        self.lock = threading.Lock()
+
+    def path(self, key, suffix):
+        return self.directory / key[:2] / key[2:4] / f'{key}{suffix}'
+
+    def touch(self, path):
+        now = time_ns()
+        os.utime(path, ns=(now, now))
+
+    def get(self, path):
+        try:
+            self.touch(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, path, content):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_name(
+            f'.{path.name}.{os.getpid()}.{threading.get_ident()}')
+        temporary.write_bytes(content)
+        os.replace(temporary, path)
+        self.touch(path)
+        with self.lock:
+            if self.size is None:
+                self.size = sum(size for _, size, _ in self.files())
+            else:
+                self.size += len(content)
+            if self.size > self.max_bytes:
+                self.evict()
+
+    def files(self):
+        for path in self.directory.rglob('*'):
+            if path.name.startswith('.'):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if path.is_file():
+                yield stat.st_mtime, stat.st_size, path
+
+    def evict(self):
+        files = sorted(self.files())
+        total = sum(size for _, size, _ in files)
+        target = self.max_bytes * RESIZED_CACHE_EVICT_RATIO
+        for _, size, path in files:
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+        self.size = total
+
+
+_caches = {}
+
+
+def get_cache():
+    key = (str(settings.BLOG_RESIZED_CACHE_DIR),
+           settings.BLOG_RESIZED_CACHE_MAX_BYTES)
+    if key not in _caches:
+        _caches[key] = ResizedImageCache(*key)
+    return _caches[key]
+
+
+def render_resized(source, width, height, image_format):
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((width, height), Image.LANCZOS)
+        if image_format == 'JPEG' and image.mode != 'RGB':
+            image = image.convert('RGB')
+        buffer = BytesIO()
+        image.save(buffer, image_format)
+    return buffer.getvalue()
+
+
+def resized_image(path, width, height):
+    """Возвращает путь к копии, вписанной в width×height, её ключ и тип;
+    FileNotFoundError, если оригинала нет."""
+    source = source_path(path)
+    if source is None or not (
+            0 < width <= IMAGE_RESIZE_MAX_DIMENSION
+            and 0 < height <= IMAGE_RESIZE_MAX_DIMENSION):
+        raise FileNotFoundError(path)
+    if is_blob(path):
+        # Имя файла из хранилища по хешам уже задаёт его содержимое, а
+        # время изменения сдвигается при каждой повторной загрузке.
+        if not source.is_file():
+            raise FileNotFoundError(path)
+        version = 'blob'
+    else:
+        stat = source.stat()
+        version = f'{stat.st_mtime_ns}:{stat.st_size}'
+    image_format, content_type = RESIZE_FORMATS.get(
+        source.suffix.lower(), RESIZE_FORMATS['.jpg'])
+    key = sha256(f'{path}:{width}x{height}:{version}'.encode()).hexdigest()
+    cache = get_cache()
+    cached = cache.path(key, source.suffix.lower() or '.jpg')
+    if cache.get(cached) is None:
+        cache.put(cached, render_resized(source, width, height, image_format))
+    return cached, key, content_type
@@ -0,0 +1,52 @@
+from django.core.cache import cache
+from django.utils import timezone
+
+from .caching import invalidate_pages
+from .models import Post
+from .random_posts import invalidate_random_post_ids
+
+NEXT_PUBLICATION_KEY = 'blog:next_publication'
+MISSING = object()
+
+
+def scheduled_posts():
+    return Post.objects.filter(
+        is_visible=False,
+        is_published=True,
+        category__is_published=True
+    )
+
+
+def next_publication():
+    pub_date = cache.get(NEXT_PUBLICATION_KEY, MISSING)
+    if pub_date is MISSING:
+        pub_date = scheduled_posts().order_by('pub_date').values_list(
+            'pub_date', flat=True).first()
+        cache.set(NEXT_PUBLICATION_KEY, pub_date, None)
+    return pub_date
+
+
+def reschedule():
+    cache.delete(NEXT_PUBLICATION_KEY)
+
+
+def publish_due_posts():
+    pub_date = next_publication()
+    if pub_date is None or pub_date > timezone.now():
+        return
+    due_posts = list(scheduled_posts().filter(
+        pub_date__lte=timezone.now()
+    ).values_list('pk', 'author_id', 'category_id'))
+    Post.objects.filter(
+        pk__in=[pk for pk, *_ in due_posts]).update(is_visible=True)
+    tag_ids = Post.tags.through.objects.filter(
+        post_id__in=[pk for pk, *_ in due_posts]
+    ).values_list('tag_id', flat=True).distinct()
+    dependencies = {'feed'}
+    dependencies.update(f'tag:{tag_id}' for tag_id in tag_ids)
+    for pk, author_id, category_id in due_posts:
+        dependencies.update((f'post:{pk}', f'author:{author_id}',
+                             f'category:{category_id}'))
+    invalidate_pages(*dependencies)
+    invalidate_random_post_ids()
+    reschedule()
@@ -0,0 +1,88 @@
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, When
+
+from .constants import SEARCH_RESULTS_LIMIT
+from .models import Category, Post, Tag
+
+FTS_TABLE = 'blog_post_fts'
+
+INDEX_SQL = f'''
+    INSERT INTO {FTS_TABLE} (rowid, title, text, tags, category)
+    SELECT post.id, post.title, post.text,
+           COALESCE((SELECT group_concat(tag.tag, ' ')
+                     FROM {Tag._meta.db_table} tag
+                     JOIN {Post.tags.through._meta.db_table} link
+                       ON link.tag_id = tag.id
+                     WHERE link.post_id = post.id), ''),
+           COALESCE(category.title, '')
+    FROM {Post._meta.db_table} post
+    LEFT JOIN {Category._meta.db_table} category
+      ON category.id = post.category_id
+'''
+
+
+def search_available():
+    return connection.vendor == 'sqlite'
+
+
+def build_match_query(search):
+    return ' '.join(
+        '"{}"*'.format(term.replace('"', '""')) for term in search.split())
+
+
+def _execute(sql, params=()):
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def reindex_posts(where, params=()):
+    if not search_available():
+        return
+    _execute(
+        f'DELETE FROM {FTS_TABLE} WHERE rowid IN '
+        f'(SELECT post.id FROM {Post._meta.db_table} post WHERE {where})',
+        params)
+    _execute(f'{INDEX_SQL} WHERE {where}', params)
+
+
+def index_post_ids(post_ids):
+    post_ids = list(post_ids)
+    if post_ids:
+        reindex_posts(
+            f'post.id IN ({", ".join(["%s"] * len(post_ids))})', post_ids)
+
+
+def unindex_post(post_id):
+    if search_available():
+        _execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', (post_id,))
+
+
+def rebuild_index():
+    _execute(f'DELETE FROM {FTS_TABLE}')
+    _execute(INDEX_SQL)
+
+
+def search_post_ids(search, limit=SEARCH_RESULTS_LIMIT):
+    """id видимых публикаций по релевантности: видимость проверяется до
+    LIMIT, чтобы скрытые совпадения не вытесняли видимые."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT {FTS_TABLE}.rowid FROM {FTS_TABLE} '
+            f'JOIN {Post._meta.db_table} post '
+            f'ON post.id = {FTS_TABLE}.rowid AND post.is_visible '
+            f'WHERE {FTS_TABLE} MATCH %s '
+            f'ORDER BY bm25({FTS_TABLE}) LIMIT %s',
+            (build_match_query(search), limit))
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search_posts(queryset, search):
+    if not search.split():
+        return queryset.none()
+    if not search_available():
+        return queryset.filter(
+            Q(title__icontains=search) | Q(text__icontains=search))
+    post_ids = search_post_ids(search)
+    return queryset.filter(pk__in=post_ids).order_by(Case(
+        *[When(pk=pk, then=rank) for rank, pk in enumerate(post_ids)],
+        output_field=IntegerField()))
@@ -0,0 +1,188 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Case, F, Value, When
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete, pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .caching import invalidate_pages
+from .image_jobs import enqueue_image_job
+from .images import delete_derivatives
+from .metrics import registry
+from .models import Category, Comment, Location, Post, Tag
+from .random_posts import invalidate_random_post_ids
+from .scheduler import reschedule
+from .search import index_post_ids, reindex_posts, unindex_post
+
+
+@receiver(pre_save, sender=Post)
+def set_post_visibility(sender, instance, **kwargs):
+    instance.is_visible = bool(
+        instance.is_published
+        and instance.pub_date <= timezone.now()
+        and Category.objects.filter(
+            pk=instance.category_id, is_published=True).exists())
+
+
+@receiver(post_save, sender=Category)
+def update_category_posts_visibility(sender, instance, **kwargs):
+    posts = Post.objects.filter(category=instance)
+    if instance.is_published:
+        posts.update(is_visible=Case(
+            When(is_published=True, pub_date__lte=timezone.now(),
+                 then=Value(True)),
+            default=Value(False)))
+    else:
+        posts.update(is_visible=False)
+
+
+@receiver(pre_delete, sender=Category)
+def hide_category_posts(sender, instance, **kwargs):
+    Post.objects.filter(category=instance).update(is_visible=False)
+
+
+@receiver(post_save, sender=Comment)
+def increase_comment_count(sender, instance, created, **kwargs):
+    if created:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1)
+
+
+@receiver(post_delete, sender=Comment)
+def decrease_comment_count(sender, instance, **kwargs):
+    Post.objects.filter(
+        pk=instance.post_id, comment_count__gt=0
+    ).update(comment_count=F('comment_count') - 1)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def reset_random_post_ids(sender, **kwargs):
+    invalidate_random_post_ids()
+    reschedule()
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, **kwargs):
+    index_post_ids([instance.pk])
+
+
+@receiver(post_delete, sender=Post)
+def unindex_deleted_post(sender, instance, **kwargs):
+    unindex_post(instance.pk)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def index_post_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        instance._cleared_post_ids = list(
+            instance.post_set.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        if not reverse:
+            index_post_ids([instance.pk])
+        elif action == 'post_clear':
+            index_post_ids(getattr(instance, '_cleared_post_ids', ()))
+        else:
+            index_post_ids(pk_set)
+
+
+@receiver(post_save, sender=Category)
+def index_category_posts(sender, instance, **kwargs):
+    reindex_posts('post.category_id = %s', (instance.pk,))
+
+
+@receiver(post_delete, sender=Category)
+def index_uncategorized_posts(sender, instance, **kwargs):
+    reindex_posts('post.category_id IS NULL')
+
+
+@receiver(post_save, sender=Tag)
+def index_tag_posts(sender, instance, **kwargs):
+    index_post_ids(instance.post_set.values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender=Tag)
+def remember_tag_posts(sender, instance, **kwargs):
+    instance._deleted_post_ids = list(
+        instance.post_set.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Tag)
+def index_untagged_posts(sender, instance, **kwargs):
+    index_post_ids(getattr(instance, '_deleted_post_ids', ()))
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_pages(sender, instance, **kwargs):
+    invalidate_pages('feed', f'post:{instance.pk}',
+                     f'author:{instance.author_id}',
+                     f'category:{instance.category_id}')
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def invalidate_post_tag_pages(sender, instance, action, reverse, pk_set,
+                              **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    prefix, related_prefix = ('tag', 'post') if reverse else ('post', 'tag')
+    invalidate_pages('feed', f'{prefix}:{instance.pk}',
+                     *[f'{related_prefix}:{pk}' for pk in pk_set or ()])
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_pages(sender, instance, **kwargs):
+    invalidate_pages('feed', f'category:{instance.pk}')
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_location_pages(sender, instance, **kwargs):
+    invalidate_pages(f'location:{instance.pk}')
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_tag_pages(sender, instance, **kwargs):
+    invalidate_pages(f'tag:{instance.pk}')
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_pages(sender, instance, **kwargs):
+    invalidate_pages(f'post:{instance.post_id}')
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_author_pages(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) == {'last_login'}:
+        return
+    invalidate_pages(f'author:{instance.pk}')
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def count_saved_writes(sender, created, **kwargs):
+    registry.inc('blog_writes_total', model=sender._meta.model_name,
+                 action='created' if created else 'updated')
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+def count_deleted_writes(sender, **kwargs):
+    registry.inc('blog_writes_total', model=sender._meta.model_name,
+                 action='deleted')
+
+
+@receiver(post_save, sender=Post)
+def queue_post_image_derivatives(sender, instance, **kwargs):
+    enqueue_image_job(instance)
+
+
+@receiver(post_delete, sender=Post)
+def delete_post_image_derivatives(sender, instance, **kwargs):
+    delete_derivatives(instance.image_derivatives)
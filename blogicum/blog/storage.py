@@ -0,0 +1,48 @@
+import os
+import re
+from hashlib import sha256
+from pathlib import PurePosixPath
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+BLOB_NAME = re.compile(r'^[0-9a-f]{64}(\.\w+)?$')
+
+
+def is_blob(name):
+    return bool(BLOB_NAME.match(PurePosixPath(name).name))
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранит каждый файл один раз под его SHA-256: `каталог/ab/<хеш>.jpg`.
+
+    Повторная загрузка тех же байтов возвращает уже сохранённое имя, так что
+    на файл может ссылаться несколько публикаций; файлы без ссылок удаляет
+    команда collect_image_garbage.
+    """
+
+    def content_name(self, name, content):
+        digest = sha256()
+        content.seek(0)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        digest = digest.hexdigest()
+        path = PurePosixPath(name)
+        return str(path.parent / digest[:2] /
+                   f'{digest}{path.suffix.lower()}')
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.content_name(name, content)
+        if self.exists(name):
+            # Свежая отметка времени не даёт сборщику мусора удалить файл,
+            # пока ссылающаяся на него публикация ещё не сохранена.
+            os.utime(self.path(name))
+            return name
+        return self._save(name, content)
@@ -0,0 +1,16 @@
+from django import template
+
+from blog.caching import page_dependency_versions, post_dependencies
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_card_key(post):
+    """Ключ кэша карточки из версий её публикации, автора, категории,
+    места и тегов: чужие правки карточку не сбрасывают."""
+    versions = page_dependency_versions(post_dependencies(post))
+    return '.'.join(
+        [str(post.comment_count)]
+        + [f'{dependency}={versions[dependency]}'
+           for dependency in sorted(versions)])
@@ -0,0 +1,38 @@
+from django import template
+
+from blog.resized_images import resized_image_url
+
+register = template.Library()
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(post, sizes, css_class='', lazy=True):
+    """Картинка публикации с srcset уменьшенных копий; пока копии текущей
+    картинки не готовы, показывается оригинал."""
+    derivatives = post.image_derivatives or {}
+    if derivatives.get('source') != post.image.name:
+        derivatives = {}
+    srcsets = {}
+    for rendition in derivatives.get('renditions', ()):
+        srcsets.setdefault(rendition['type'], []).append(
+            (post.image.storage.url(rendition['name']), rendition['width']))
+    jpeg = srcsets.get('image/jpeg', [])
+    return {
+        'post': post,
+        'src': jpeg[-1][0] if jpeg else post.image.url,
+        'width': derivatives.get('width'),
+        'height': derivatives.get('height'),
+        'webp_srcset': ', '.join(
+            f'{url} {width}w' for url, width in srcsets.get(
+                'image/webp', [])),
+        'jpeg_srcset': ', '.join(f'{url} {width}w' for url, width in jpeg),
+        'sizes': sizes,
+        'css_class': css_class,
+        'lazy': lazy,
+    }
+
+
+@register.simple_tag
+def resized_url(image, width, height):
+    """Подписанная ссылка на копию картинки, вписанную в width×height."""
+    return resized_image_url(image.name, width, height)
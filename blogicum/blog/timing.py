@@ -0,0 +1,40 @@
+from contextvars import ContextVar
+from time import perf_counter
+
+current_timings = ContextVar('current_timings', default=None)
+
+
+class RequestTimings:
+    """Время, потраченное запросом на БД, шаблоны и кэш."""
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.db = 0.0
+        self.db_queries = 0
+        self.template = 0.0
+        self.cache = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @property
+    def total(self):
+        return perf_counter() - self.started
+
+    def server_timing(self):
+        total = self.total
+        return ', '.join((
+            f'db;dur={self.db * 1000:.2f};desc="{self.db_queries} queries"',
+            f'tpl;dur={self.template * 1000:.2f}',
+            f'cache;dur={self.cache * 1000:.2f};'
+            f'desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+            f'view;dur={(total - self.template) * 1000:.2f}',
+            f'total;dur={total * 1000:.2f}',
+        ))
+
+
+def record_cache_call(duration, hits=0, misses=0):
+    timings = current_timings.get()
+    if timings is not None:
+        timings.cache += duration
+        timings.cache_hits += hits
+        timings.cache_misses += misses
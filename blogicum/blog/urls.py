@@ -20,6 +20,8 @@ urlpatterns = [
          name='profile'),
     path('edit_profile/', views.ProfileUpdateView.as_view(),
          name='edit_profile'),
+    path('posts/<int:post_id>/comments/', views.PostCommentsView.as_view(),
+         name='post_comments'),
     path('posts/<int:post_id>/comment/', views.CommentCreateView.as_view(),
          name='add_comment'),
     path('posts/<int:post_id>/edit_comment/<int:comment_id>/',
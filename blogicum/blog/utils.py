@@ -1,29 +1,22 @@
+from django.conf import settings
 from django.core.paginator import Paginator
-from django.db.models import Count
-from django.utils import timezone
 
-from .constants import SHOWED_ITEMS
+from .constants import COMMENTS_PER_PAGE, CURSOR_QUERY_PARAM, SHOWED_ITEMS
 from .models import Comment, Category, Post
+from .paginators import CursorPaginator
 
 
-def all_posts_queryset():
-    return Post.objects.prefetch_related('tags').select_related(
+def all_posts_queryset(queryset=None):
+    if queryset is None:
+        queryset = Post.objects.all()
+    return queryset.prefetch_related('tags').select_related(
         'category',
         'location',
-        'author').order_by('-pub_date')
+        'author').order_by('-pub_date', '-pk')
 
 
-def filtered_posts_queryset():
-    return Post.objects.prefetch_related('tags').select_related(
-        'category',
-        'location',
-        'author').filter(
-            pub_date__lte=timezone.now(),
-            is_published=True,
-            category__is_published=True
-    ).annotate(
-            comment_count=Count('commented_post')
-    ).order_by('-pub_date')
+def filtered_posts_queryset(queryset=None):
+    return all_posts_queryset(queryset).filter(is_visible=True)
 
 
 def all_comments_queryset():
@@ -32,12 +25,23 @@ def all_comments_queryset():
         'post')
 
 
+def comments_paginator(post):
+    return CursorPaginator(
+        post.commented_post.select_related('author'),
+        COMMENTS_PER_PAGE,
+        key_field='created_at',
+        descending=False)
+
+
 def published_category_queryset():
     return Category.objects.all().filter(
         is_published=True)
 
 
 def paginate_queryset(queryset, request):
+    if settings.BLOG_CURSOR_PAGINATION:
+        return CursorPaginator(queryset, SHOWED_ITEMS).get_page(
+            request.GET.get(CURSOR_QUERY_PARAM))
     paginator = Paginator(queryset, SHOWED_ITEMS)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
@@ -1,21 +1,30 @@
-from random import choice
-
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.core.exceptions import PermissionDenied
-from django.db.models import Count, Q
+from django.http import (FileResponse, Http404, HttpResponse,
+                         HttpResponseNotModified)
 from django.shortcuts import get_object_or_404, redirect
-from django.views.generic import (CreateView, DeleteView,
-                                  DetailView, ListView, UpdateView)
+from django.views.generic import (CreateView, DeleteView, DetailView,
+                                  ListView, TemplateView, UpdateView, View)
 from django.views.generic.edit import ModelFormMixin
 from django.urls import reverse
-from django.utils import timezone
+from django.utils.crypto import constant_time_compare
 
-from .constants import SHOWED_ITEMS
+from .constants import (COMMENTS_QUERY_PARAM, CURSOR_QUERY_PARAM,
+                        RESIZED_IMAGE_MAX_AGE, RESIZED_IMAGE_SIGNATURE_PARAM,
+                        SHOWED_ITEMS)
 from .forms import CommentForm, PostForm, UserForm
+from .metrics import registry, render as render_metrics
 from .models import Category, Comment, Post, Tag
+from .paginators import START, CursorPaginator
+from .profiling import profile
+from .random_posts import random_post
+from .resized_images import resize_signature, resized_image
+from .search import search_posts
 from .utils import (all_comments_queryset,
                     all_posts_queryset,
+                    comments_paginator,
                     filtered_posts_queryset,
                     paginate_queryset,
                     published_category_queryset)
@@ -36,11 +45,21 @@ class PostModifyMixin:
         return reverse('blog:profile', kwargs={'username': self.request.user})
 
 
+class MemoizedObjectMixin:
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_object'):
+            self._object = super().get_object()
+        return self._object
+
+
 class DispatchMixin:
 
     def dispatch(self, request, *args, **kwargs):
         instance = self.get_object()
-        if instance.author != self.request.user:
+        if instance.author_id != self.request.user.pk:
             raise PermissionDenied
         return super().dispatch(request, *args, **kwargs)
 
@@ -61,14 +80,19 @@ class PostListView(PostModelMixin, ListView):
         search = self.request.GET.get('q')
         queryset = filtered_posts_queryset()
         if search:
-            return queryset.filter(
-                Q(title__contains=search)
-                | Q(title__contains=search.lower())
-                | Q(title__contains=search.capitalize()))
+            return search_posts(queryset, search)
         elif self.kwargs.get('tag_slug'):
             return queryset.filter(tags__slug=self.kwargs['tag_slug'])
         return queryset
 
+    def paginate_queryset(self, queryset, page_size):
+        if not settings.BLOG_CURSOR_PAGINATION or self.request.GET.get('q'):
+            return super().paginate_queryset(queryset, page_size)
+        page = CursorPaginator(queryset, page_size).get_page(
+            self.request.GET.get(CURSOR_QUERY_PARAM))
+        return (page.paginator, page, page.object_list,
+                page.has_other_pages())
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['search'] = self.request.GET.get('q')
@@ -81,8 +105,13 @@ class PostListView(PostModelMixin, ListView):
 class RandomDetailView(PostModelMixin, DetailView):
     template_name = 'blog/random.html'
 
-    def get_object(self, queryset=filtered_posts_queryset()):
-        return choice(queryset)
+    def get_object(self, queryset=None):
+        if queryset is None:
+            queryset = filtered_posts_queryset()
+        post = random_post(queryset)
+        if post is None:
+            raise Http404
+        return post
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -90,10 +119,20 @@ class RandomDetailView(PostModelMixin, DetailView):
         return context
 
 
-class PostDetailView(PostModelMixin, PostPkMixin, DetailView):
+class PostCommentsMixin:
+
+    def get_comments_page(self):
+        return comments_paginator(self.object).get_page(
+            self.request.GET.get(COMMENTS_QUERY_PARAM))
+
+
+class PostDetailView(PostModelMixin, PostPkMixin, PostCommentsMixin,
+                     DetailView):
     template_name = 'blog/detail.html'
 
-    def get_object(self, queryset=all_posts_queryset()):
+    def get_object(self, queryset=None):
+        if queryset is None:
+            queryset = all_posts_queryset()
         instance = get_object_or_404(queryset, pk=self.kwargs['post_id'])
         if instance.author == self.request.user:
             return instance
@@ -103,23 +142,30 @@ class PostDetailView(PostModelMixin, PostPkMixin, DetailView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = self.object.commented_post.select_related(
-            'author')
+        context['comments'] = self.get_comments_page()
         context['post'] = self.object
         return context
 
 
+class PostCommentsView(PostDetailView):
+    template_name = 'includes/comment_list.html'
+
+    def get_context_data(self, **kwargs):
+        return {'post': self.object, 'comments': self.get_comments_page(),
+                'fragment': True}
+
+
 class PostCreateView(LoginRequiredMixin, PostModelMixin,
                      PostModifyMixin, PostFormMixin, CreateView):
     pass
 
 
-class PostUpdateView(LoginRequiredMixin, PostModelMixin,
+class PostUpdateView(LoginRequiredMixin, MemoizedObjectMixin, PostModelMixin,
                      PostPkMixin, PostModifyMixin, PostFormMixin, UpdateView):
 
     def dispatch(self, request, *args, **kwargs):
         instance = self.get_object()
-        if instance.author != self.request.user:
+        if instance.author_id != self.request.user.pk:
             return redirect('blog:post_detail', self.kwargs['post_id'])
         return super().dispatch(request, *args, **kwargs)
 
@@ -128,8 +174,8 @@ class PostUpdateView(LoginRequiredMixin, PostModelMixin,
             'post_id': self.kwargs['post_id']})
 
 
-class PostDeleteView(LoginRequiredMixin, PostModelMixin, PostPkMixin,
-                     PostModifyMixin, DispatchMixin,
+class PostDeleteView(LoginRequiredMixin, MemoizedObjectMixin, PostModelMixin,
+                     PostPkMixin, PostModifyMixin, DispatchMixin,
                      DeleteView, ModelFormMixin):
     fields = ('text', 'title', 'pub_date', 'location', 'image')
 
@@ -148,12 +194,7 @@ class CategoryDetailView(DetailView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        chosen_posts = self.object.category_posts.filter(
-            is_published=True,
-            pub_date__lte=timezone.now()
-        ).annotate(
-            comment_count=Count('commented_post')
-        ).order_by('-pub_date')
+        chosen_posts = filtered_posts_queryset(self.object.category_posts)
         page_obj = paginate_queryset(chosen_posts, self.request)
         context['page_obj'] = page_obj
         return context
@@ -164,8 +205,12 @@ class CommentModifyMixin:
     template_name = 'blog/comment.html'
 
     def get_success_url(self):
-        return reverse('blog:post_detail', kwargs={
-            'post_id': self.kwargs['post_id']})
+        cursor = comments_paginator(self.object.post).encode_cursor(
+            self.object, START)
+        return '{}?{}={}#comment_{}'.format(
+            reverse('blog:post_detail', kwargs={
+                'post_id': self.kwargs['post_id']}),
+            COMMENTS_QUERY_PARAM, cursor, self.object.pk)
 
 
 class CommentFormMixin:
@@ -184,7 +229,9 @@ class CommentMethodsMixin:
 class CommentCreateView(LoginRequiredMixin, CommentModifyMixin,
                         CommentFormMixin, CreateView):
 
-    def get_object(self, queryset=filtered_posts_queryset()):
+    def get_object(self, queryset=None):
+        if queryset is None:
+            queryset = filtered_posts_queryset()
         return get_object_or_404(
             queryset,
             pk=self.kwargs['post_id'])
@@ -195,21 +242,24 @@ class CommentCreateView(LoginRequiredMixin, CommentModifyMixin,
         return super().form_valid(form)
 
 
-class CommentUpdateView(LoginRequiredMixin, CommentModifyMixin,
-                        CommentFormMixin, CommentMethodsMixin,
-                        DispatchMixin, UpdateView):
+class CommentUpdateView(LoginRequiredMixin, MemoizedObjectMixin,
+                        CommentModifyMixin, CommentFormMixin,
+                        CommentMethodsMixin, DispatchMixin, UpdateView):
 
     def form_valid(self, form):
+        if not form.instance.post.is_visible:
+            raise Http404
         form.instance.author = self.request.user
-        form.instance.post = get_object_or_404(
-            filtered_posts_queryset(),
-            pk=self.kwargs['post_id'])
         return super().form_valid(form)
 
 
-class CommentDeleteView(LoginRequiredMixin, CommentModifyMixin,
-                        CommentMethodsMixin, DispatchMixin, DeleteView):
-    pass
+class CommentDeleteView(LoginRequiredMixin, MemoizedObjectMixin,
+                        CommentModifyMixin, CommentMethodsMixin,
+                        DispatchMixin, DeleteView):
+
+    def get_success_url(self):
+        return reverse('blog:post_detail', kwargs={
+            'post_id': self.kwargs['post_id']})
 
 
 class ProfileDetailView(DetailView):
@@ -221,16 +271,9 @@ class ProfileDetailView(DetailView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         if self.object == self.request.user:
-            chosen_posts = self.object.author_posts.all(
-            ).annotate(comment_count=Count('commented_post')).order_by(
-                '-pub_date')
+            chosen_posts = all_posts_queryset(self.object.author_posts)
         else:
-            chosen_posts = self.object.author_posts.filter(
-                is_published=True,
-                category__is_published=True,
-                pub_date__lte=timezone.now()).annotate(
-                    comment_count=Count('commented_post')
-            ).order_by('-pub_date')
+            chosen_posts = filtered_posts_queryset(self.object.author_posts)
         page_obj = paginate_queryset(chosen_posts, self.request)
         context['page_obj'] = page_obj
         context['profile'] = self.object
@@ -249,3 +292,61 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
 
     def get_success_url(self):
         return reverse('blog:profile', kwargs={'username': self.request.user})
+
+
+class SQLProfileView(UserPassesTestMixin, TemplateView):
+    template_name = 'blog/sql_profile.html'
+    orderings = ('duration', 'calls', 'rows')
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get_context_data(self, **kwargs):
+        order_by = self.request.GET.get('order')
+        if order_by not in self.orderings:
+            order_by = self.orderings[0]
+        return super().get_context_data(
+            fingerprints=profile.top(order_by), order_by=order_by,
+            requests=profile.requests, dropped=profile.dropped,
+            sample_rate=settings.BLOG_SQL_PROFILE_SAMPLE_RATE, **kwargs)
+
+    def post(self, request, *args, **kwargs):
+        profile.reset()
+        return redirect('sql_profile')
+
+
+class MetricsView(UserPassesTestMixin, View):
+
+    def test_func(self):
+        token = settings.BLOG_METRICS_TOKEN
+        authorization = self.request.headers.get('Authorization', '')
+        return self.request.user.is_staff or bool(
+            token and constant_time_compare(
+                authorization, f'Bearer {token}'))
+
+    def get(self, request):
+        return HttpResponse(
+            render_metrics(registry.collect(settings.BLOG_METRICS_DIR)),
+            content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+class ResizedImageView(View):
+    def get(self, request, width, height, path):
+        signature = request.GET.get(RESIZED_IMAGE_SIGNATURE_PARAM, '')
+        if not constant_time_compare(
+                signature, resize_signature(width, height, path)):
+            raise PermissionDenied
+        try:
+            cached, key, content_type = resized_image(path, width, height)
+        except FileNotFoundError:
+            raise Http404
+        etag = f'"{key}"'
+        if etag in request.headers.get('If-None-Match', ''):
+            response = HttpResponseNotModified()
+        else:
+            response = FileResponse(
+                open(cached, 'rb'), content_type=content_type)
+        response['ETag'] = etag
+        response['Cache-Control'] = (
+            f'public, max-age={RESIZED_IMAGE_MAX_AGE}, immutable')
+        return response
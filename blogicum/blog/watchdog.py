@@ -0,0 +1,118 @@
+import json
+import logging
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from time import perf_counter, sleep
+
+from .constants import SLOW_REQUEST_MAX_QUERIES, SLOW_REQUEST_SAMPLE_INTERVAL
+
+logger = logging.getLogger('blog.slow_requests')
+
+
+def frame_name(frame):
+    return f'{frame.f_globals.get("__name__", "?")}:{frame.f_code.co_name}'
+
+
+def collapse_stack(frame):
+    """Стек в формате collapsed (flamegraph.pl, speedscope): от корня к
+    листу через `;`."""
+    names = []
+    while frame is not None:
+        names.append(frame_name(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class WatchedRequest:
+    """Запрос под наблюдением; заодно execute_wrapper, запоминающий SQL."""
+
+    def __init__(self, request):
+        self.thread_id = threading.get_ident()
+        self.started = perf_counter()
+        self.method = request.method
+        self.url = request.get_full_path()
+        self.view_class = None
+        self.queries = []
+        self.skipped_queries = 0
+        self.stacks = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        if len(self.queries) < SLOW_REQUEST_MAX_QUERIES:
+            self.queries.append(sql)
+        else:
+            self.skipped_queries += 1
+        return execute(sql, params, many, context)
+
+    @property
+    def elapsed(self):
+        return perf_counter() - self.started
+
+    def record(self, event):
+        return {
+            'event': event,
+            'method': self.method,
+            'url': self.url,
+            'view_class': self.view_class,
+            'elapsed_ms': round(self.elapsed * 1000, 2),
+            'queries': list(self.queries),
+            'skipped_queries': self.skipped_queries,
+            'stacks': [f'{stack} {count}'
+                       for stack, count in self.stacks.most_common()],
+        }
+
+
+class Watchdog:
+    """Фоновый поток, который снимает стеки запросов дольше `threshold`
+    секунд раз в `interval` секунд."""
+
+    def __init__(self, threshold=None, interval=SLOW_REQUEST_SAMPLE_INTERVAL):
+        self.threshold = threshold
+        self.interval = interval
+        self.requests = {}
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self.run, name='slow-request-watchdog',
+                    daemon=True)
+                self.thread.start()
+
+    @contextmanager
+    def watch(self, request):
+        watched = WatchedRequest(request)
+        self.requests[watched.thread_id] = watched
+        try:
+            yield watched
+        finally:
+            del self.requests[watched.thread_id]
+            if watched.stacks:
+                logger.warning(json.dumps(
+                    watched.record('slow_request'), ensure_ascii=False))
+
+    def run(self):
+        while True:
+            sleep(self.interval)
+            self.sample()
+
+    def sample(self):
+        frames = None
+        for watched in list(self.requests.values()):
+            if not self.threshold or watched.elapsed < self.threshold:
+                continue
+            frames = frames or sys._current_frames()
+            frame = frames.get(watched.thread_id)
+            if frame is None:
+                continue
+            if not watched.stacks:
+                logger.warning(json.dumps(
+                    watched.record('slow_request_started'),
+                    ensure_ascii=False))
+            watched.stacks[collapse_stack(frame)] += 1
+
+
+watchdog = Watchdog()
@@ -48,15 +48,27 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'blog.middleware.SlowRequestWatchdogMiddleware',
+    'blog.middleware.MetricsMiddleware',
+    'blog.middleware.ServerTimingMiddleware',
+    'blog.middleware.ViewBudgetMiddleware',
+    'blog.middleware.SQLProfilingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'blog.middleware.OnDemandProfilerMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware'
+    'debug_toolbar.middleware.DebugToolbarMiddleware',
+    'blog.middleware.PublicationSchedulerMiddleware',
+    'blog.middleware.AnonymousPageCacheMiddleware',
 ]
 
+# In production requests are profiled on demand by staff instead
+if not DEBUG:
+    MIDDLEWARE.remove('debug_toolbar.middleware.DebugToolbarMiddleware')
+
 ROOT_URLCONF = 'blogicum.urls'
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
@@ -72,6 +84,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'blog.context_processors.post_card_cache',
             ],
         },
     },
@@ -144,10 +157,90 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'blog:index'
 
+# Pagination of post listings by (pub_date, id) cursors instead of pages
+
+BLOG_CURSOR_PAGINATION = False
+
+# Recording of per-view query, row and latency budgets (dev and staging)
+
+BLOG_RECORD_VIEW_BUDGETS = DEBUG
+
+# Share of requests whose SQL is aggregated by fingerprint (0 disables)
+
+BLOG_SQL_PROFILE_SAMPLE_RATE = 0.05 if DEBUG else 0
+
+# Server-Timing header and JSON access log lines (logger blog.access)
+
+BLOG_SERVER_TIMING = DEBUG
+
+# Shared directory for /metrics snapshots of several worker processes
+
+BLOG_METRICS_DIR = None
+
+# Bearer token that lets a scraper read /metrics; without it the
+# endpoint is open to staff only
+
+BLOG_METRICS_TOKEN = None
+
+# Requests slower than this many seconds get their stacks sampled
+# into the blog.slow_requests log (None disables the watchdog)
+
+BLOG_SLOW_REQUEST_THRESHOLD = 2.0 if DEBUG else None
+
+# Where staff-requested profiles (?profile=sample|trace) are stored;
+# None returns the collapsed stacks instead of the page
+
+BLOG_PROFILE_DIR = None
+
+# Caching. Page and post card invalidation bumps version stamps in the
+# default cache, so with several worker processes it has to be a shared
+# backend (Redis, Memcached, database); the per-process cache below only
+# fits a single process (check blog.W001)
+
+CACHES = {
+    'default': {
+        'BACKEND': 'blog.cache_backends.InstrumentedLocMemCache',
+    },
+}
+
+# Logging
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'json': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'message',
+        },
+    },
+    'loggers': {
+        'blog.access': {
+            'handlers': ['json'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'blog.slow_requests': {
+            'handlers': ['json'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
 # Uploading mediafiles
 
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Sharded cache of /media-resized/ copies; the least recently requested
+# ones are evicted once it grows past the byte budget
+
+BLOG_RESIZED_CACHE_DIR = BASE_DIR / 'media_resized'
+BLOG_RESIZED_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
 # Sending emails
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
@@ -20,11 +20,17 @@ from django.contrib.auth.forms import UserCreationForm
 from django.views.generic.edit import CreateView
 from django.urls import include, path, reverse_lazy
 
+from blog.views import MetricsView, ResizedImageView, SQLProfileView
+
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('blog.urls')),
     path('pages/', include('pages.urls')),
+    path('sql-profile/', SQLProfileView.as_view(), name='sql_profile'),
+    path('metrics', MetricsView.as_view(), name='metrics'),
+    path('media-resized/<int:width>x<int:height>/<path:path>',
+         ResizedImageView.as_view(), name='resized_image'),
     path('auth/', include('django.contrib.auth.urls')),
     path('auth/registration/', CreateView.as_view(
         form_class=UserCreationForm,
@@ -0,0 +1,89 @@
+import os
+from datetime import timedelta
+from time import perf_counter
+from typing import NamedTuple
+
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.budgets import budget_violations, get_budget
+from blog.instrumentation import collect_query_stats
+from blog.scheduler import publish_due_posts
+
+BUDGET_RUNS = 10
+# Время ответа зависит от загрузки машины, поэтому в тестах p95 по
+# умолчанию не проверяется; BUDGET_LATENCY_FACTOR=3 включает проверку
+# с трёхкратным запасом. В работе p95 следит ViewBudgetMiddleware.
+BUDGET_LATENCY_FACTOR = float(os.environ.get("BUDGET_LATENCY_FACTOR", 0))
+N_SEEDED_POSTS = 60
+N_SEEDED_COMMENTS = 30
+
+SeededDataset = NamedTuple(
+    "SeededDataset",
+    [("posts", list), ("categories", list), ("tags", list),
+     ("comment", object)],
+)
+
+
+@pytest.fixture
+def seeded_dataset(mixer: Mixer, user, another_user) -> SeededDataset:
+    categories = mixer.cycle(3).blend("blog.Category", is_published=True)
+    locations = mixer.cycle(3).blend("blog.Location", is_published=True)
+    tags = mixer.cycle(5).blend("blog.Tag", slug=mixer.sequence("tag{0}"))
+    posts = mixer.cycle(N_SEEDED_POSTS).blend(
+        "blog.Post",
+        author=mixer.sequence(user, another_user),
+        category=mixer.sequence(*categories),
+        location=mixer.sequence(*locations),
+        is_published=True,
+        pub_date=mixer.sequence(
+            lambda i: timezone.now() - timedelta(hours=i + 1)),
+    )
+    for i, post in enumerate(posts):
+        post.tags.set(tags[:i % len(tags) + 1])
+    comments = mixer.cycle(N_SEEDED_COMMENTS).blend(
+        "blog.Comment", post=posts[0], author=mixer.sequence(
+            user, another_user))
+    return SeededDataset(posts, categories, tags, comments[0])
+
+
+@pytest.fixture
+def assert_view_within_budget():
+    """Requests `url` several times with cold caches and fails if the view
+    exceeds its query or row budget from `blog/budgets.py` (and its p95,
+    scaled by BUDGET_LATENCY_FACTOR, when that is set)."""
+
+    def check(client, url, method="get", data=None, runs=BUDGET_RUNS):
+        durations_ms = []
+        max_queries = max_rows = 0
+        for _ in range(runs):
+            cache.clear()
+            publish_due_posts()
+            started = perf_counter()
+            with collect_query_stats() as stats:
+                response = getattr(client, method)(url, data or {})
+            durations_ms.append((perf_counter() - started) * 1000)
+            max_queries = max(max_queries, stats.queries)
+            max_rows = max(max_rows, stats.rows)
+        view_name = response.resolver_match.view_name
+        budget = get_budget(
+            view_name, response.wsgi_request.user.is_authenticated)
+        assert budget is not None, (
+            f"Задайте бюджет для `{view_name}` в `blog/budgets.py`."
+        )
+        if BUDGET_LATENCY_FACTOR:
+            budget = budget._replace(
+                p95_ms=budget.p95_ms * BUDGET_LATENCY_FACTOR)
+        else:
+            durations_ms = ()
+        violations = budget_violations(
+            budget, max_queries, max_rows, durations_ms)
+        assert not violations, (
+            f"View `{view_name}` ({url}) превышает бюджет: "
+            + ", ".join(violations)
+        )
+        return response
+
+    return check
@@ -0,0 +1,33 @@
+import pytest
+from django.urls import reverse
+
+from blog.benchmarks import find_regressions, run_benchmarks
+
+
+@pytest.mark.django_db
+def test_run_benchmarks_covers_blog_and_pages_views(seeded_dataset):
+    results = run_benchmarks(runs=2)
+    for view_name in ("blog:index", "blog:edit_post", "blog:edit_comment",
+                      "pages:about", "pages:rules"):
+        assert view_name in results, (
+            f"Бенчмарк должен замерять `{view_name}`."
+        )
+    assert results["pages:about"]["url"] == reverse("pages:about")
+    for view_name, metrics in results.items():
+        assert metrics["status"] == 200, (
+            f"Бенчмарк получил статус {metrics['status']} для `{view_name}`."
+        )
+        assert metrics["p50_ms"] <= metrics["p95_ms"] <= metrics["p99_ms"]
+        assert metrics["peak_kib"] > 0
+
+
+def test_find_regressions_respects_threshold():
+    metrics = {"p95_ms": 10.0, "queries": 4, "peak_kib": 100.0}
+    baseline = {"1000": {"blog:index": metrics}}
+    assert not find_regressions(
+        {"1000": {"blog:index": dict(metrics, p95_ms=11.0)}}, baseline, 0.2)
+    regressions = find_regressions(
+        {"1000": {"blog:index": dict(metrics, queries=5)},
+         "10000": {"blog:index": dict(metrics, queries=50)}},
+        baseline, 0.2)
+    assert regressions == ["blog:index [1000]: queries 4 → 5"]
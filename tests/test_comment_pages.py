@@ -0,0 +1,62 @@
+import re
+from datetime import timedelta
+
+import pytest
+from django.test import Client
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+COMMENTS_PER_PAGE = 20
+
+
+@pytest.fixture
+def commented_post(mixer: Mixer, user, another_user, published_category):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(days=1))
+    comments = mixer.cycle(COMMENTS_PER_PAGE + 5).blend(
+        "blog.Comment", post=post, author=another_user,
+        text=mixer.sequence("Комментарий №{0}!"))
+    return post, comments
+
+
+def comment_ids(content):
+    return [int(pk) for pk in re.findall(r'name="comment_(\d+)"', content)]
+
+
+@pytest.mark.django_db
+def test_comments_are_paginated(client, commented_post):
+    post, comments = commented_post
+    content = client.get(f"/posts/{post.pk}/").content.decode()
+    assert comment_ids(content) == [
+        comment.pk for comment in comments[:COMMENTS_PER_PAGE]], (
+        "Убедитесь, что на странице публикации выводится только первая"
+        " страница комментариев."
+    )
+
+    fragment_url = re.search(r'data-fragment-url="([^"]+)"', content)
+    assert fragment_url
+    fragment = client.get(
+        fragment_url.group(1).replace("&amp;", "&")).content.decode()
+    assert comment_ids(fragment) == [
+        comment.pk for comment in comments[COMMENTS_PER_PAGE:]]
+    assert "<html" not in fragment
+
+
+@pytest.mark.django_db
+def test_comment_edit_redirects_to_its_anchor(
+        another_user, commented_post):
+    post, comments = commented_post
+    comment = comments[-1]
+    client = Client()
+    client.force_login(another_user)
+    response = client.post(
+        f"/posts/{post.pk}/edit_comment/{comment.pk}/",
+        {"text": "Исправленный комментарий"})
+    assert response["Location"].endswith(f"#comment_{comment.pk}")
+
+    content = client.get(response["Location"]).content.decode()
+    assert comment.pk in comment_ids(content), (
+        "Убедитесь, что после редактирования комментария страница публикации"
+        " открывается на странице с этим комментарием."
+    )
@@ -0,0 +1,95 @@
+from base64 import urlsafe_b64encode
+from datetime import timedelta
+
+import pytest
+from django.test import override_settings
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.paginators import NEXT, CursorPaginator
+from blog.utils import comments_paginator, filtered_posts_queryset
+from conftest import N_PER_PAGE
+
+
+@pytest.fixture
+def many_posts(mixer: Mixer, user, published_category):
+    pub_date = timezone.now() - timedelta(days=1)
+    return mixer.cycle(N_PER_PAGE * 2 + 5).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=pub_date)
+
+
+@pytest.mark.django_db
+@override_settings(BLOG_CURSOR_PAGINATION=True)
+def test_cursor_pagination_walks_feed(client, many_posts):
+    seen = []
+    cursor = ""
+    pages = []
+    while True:
+        response = client.get(f"/?cursor={cursor}")
+        page_obj = response.context["page_obj"]
+        pages.append(page_obj)
+        seen.extend(post.pk for post in page_obj)
+        if not page_obj.has_next():
+            break
+        cursor = page_obj.next_cursor
+    assert len(pages) == 3
+    assert sorted(seen) == sorted(post.pk for post in many_posts), (
+        "Убедитесь, что курсорная пагинация показывает каждую публикацию"
+        " ровно один раз."
+    )
+
+    response = client.get(f"/?cursor={pages[-1].previous_cursor}")
+    assert [post.pk for post in response.context["page_obj"]] == [
+        post.pk for post in pages[1]]
+
+
+def broken_cursor(pk):
+    position = f'["2020-01-01T00:00:00+00:00", {pk}, "next"]'
+    return urlsafe_b64encode(position.encode()).decode()
+
+
+@pytest.mark.django_db
+@override_settings(BLOG_CURSOR_PAGINATION=True)
+def test_cursor_pagination_ignores_broken_cursor(client, many_posts):
+    for cursor in ("not-a-cursor", broken_cursor("Infinity"),
+                   broken_cursor("99999999999999999999999")):
+        response = client.get(f"/?cursor={cursor}")
+        assert response.status_code == 200, (
+            "Испорченный курсор должен открывать первую страницу."
+        )
+        assert len(response.context["page_obj"]) == N_PER_PAGE
+
+
+@pytest.mark.django_db
+def test_cursor_page_reads_index_range(mixer: Mixer, many_posts):
+    post = many_posts[0]
+    comments = mixer.cycle(3).blend("blog.Comment", post=post)
+    oldest = min(many_posts, key=lambda item: (item.pub_date, item.pk))
+    paginators = (
+        (CursorPaginator(filtered_posts_queryset(), N_PER_PAGE), oldest),
+        (comments_paginator(post), comments[-1]),
+    )
+    for paginator, instance in paginators:
+        position = paginator.decode_cursor(
+            paginator.encode_cursor(instance, NEXT))
+        plan = paginator.page_queryset(position).explain()
+        assert "SEARCH" in plan and "SCAN" not in plan, (
+            "Страница по курсору должна читать диапазон индекса, а не"
+            f" сканировать его с начала:\n{plan}"
+        )
+
+
+@pytest.mark.django_db
+def test_listings_read_index_order(many_posts, user, published_category):
+    for queryset in (
+        filtered_posts_queryset(),
+        filtered_posts_queryset(published_category.category_posts),
+        filtered_posts_queryset(user.author_posts),
+    ):
+        plan = CursorPaginator(queryset, N_PER_PAGE).page_queryset(
+            None).explain()
+        assert "TEMP B-TREE" not in plan, (
+            "Индексы ленты должны покрывать сортировку (-pub_date, -pk):"
+            f"\n{plan}"
+        )
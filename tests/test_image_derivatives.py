@@ -0,0 +1,104 @@
+from io import BytesIO
+
+import pytest
+from bs4 import BeautifulSoup
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from PIL import Image
+
+from blog.models import ImageJob, Post
+
+
+def uploaded_image(size, name="photo.jpg"):
+    buffer = BytesIO()
+    Image.new("RGB", size, "red").save(buffer, "JPEG")
+    return SimpleUploadedFile(name, buffer.getvalue(), "image/jpeg")
+
+
+def run_image_jobs(processes=0):
+    call_command("run_image_worker", once=True, processes=processes)
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+@pytest.mark.django_db
+def test_derivatives_are_built_on_upload(
+        media_root, user_client, post_with_published_location):
+    post = post_with_published_location
+    post.image = uploaded_image((1600, 1200))
+    post.save()
+    url = reverse("blog:post_detail", args=(post.pk,))
+    assert "srcset" not in user_client.get(url).content.decode(), (
+        "Пока копии не готовы, показывается оригинал картинки."
+    )
+    job = ImageJob.objects.get(post=post, source=post.image.name)
+    assert job.status == ImageJob.PENDING
+
+    run_image_jobs(processes=1)
+    post.refresh_from_db()
+    job.refresh_from_db()
+    assert job.status == ImageJob.DONE
+
+    derivatives = post.image_derivatives
+    assert derivatives["source"] == post.image.name
+    assert (derivatives["width"], derivatives["height"]) == (1600, 1200)
+    assert sorted({item["width"] for item in derivatives["renditions"]}) == [
+        320, 640, 1024]
+    assert {item["type"] for item in derivatives["renditions"]} == {
+        "image/webp", "image/jpeg"}
+    for item in derivatives["renditions"]:
+        with Image.open(media_root / item["name"]) as image:
+            assert image.size == (item["width"], item["height"])
+
+    response = user_client.get(url)
+    soup = BeautifulSoup(response.content.decode(), features="html.parser")
+    source = soup.select_one("picture source[type='image/webp']")
+    image = soup.select_one("picture img")
+    assert source and "1024w" in source["srcset"], (
+        "Страница публикации должна предлагать WebP-копии через `srcset`."
+    )
+    assert "320w" in image["srcset"]
+    assert (image["width"], image["height"]) == ("1600", "1200")
+
+
+@pytest.mark.django_db
+def test_replaced_image_drops_old_derivatives(
+        media_root, post_with_published_location):
+    post = post_with_published_location
+    post.image = uploaded_image((800, 400))
+    post.save()
+    run_image_jobs()
+    post.refresh_from_db()
+    old_names = [item["name"] for item in post.image_derivatives["renditions"]]
+    assert sorted({item["width"] for item in Post.objects.get(
+        pk=post.pk).image_derivatives["renditions"]}) == [320, 640, 800], (
+        "Копии не должны быть шире оригинала."
+    )
+
+    post.image = uploaded_image((200, 100), "small.jpg")
+    post.save()
+    run_image_jobs()
+    post.refresh_from_db()
+    assert [item["width"] for item in post.image_derivatives["renditions"]
+            ] == [200, 200]
+    assert all(not (media_root / name).exists() for name in old_names)
+    post.delete()
+    assert not list(media_root.rglob("*.webp"))
+
+
+@pytest.mark.django_db
+def test_broken_image_job_is_retried_then_failed(
+        media_root, post_with_published_location):
+    post = post_with_published_location
+    post.image = SimpleUploadedFile("broken.jpg", b"not an image")
+    post.save()
+    run_image_jobs()
+    job = ImageJob.objects.get(post=post, source=post.image.name)
+    assert job.status == ImageJob.FAILED
+    assert job.attempts == 3
+    assert "Traceback" in job.error
@@ -0,0 +1,125 @@
+import random
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from PIL import Image, ImageDraw
+
+from blog.constants import IMAGE_DUPLICATE_DISTANCE, IMAGE_HASH_BANDS
+from blog.image_similarity import (band_neighbours, hamming, hash_bands,
+                                   similar_posts)
+from blog.models import ImageHash
+from blog.images import dhash
+
+
+def picture(seed, size=(640, 480)):
+    generator = random.Random(seed)
+    image = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(image)
+    for _ in range(12):
+        x, y = generator.randrange(size[0]), generator.randrange(size[1])
+        draw.ellipse(
+            (x, y, x + generator.randrange(40, 300),
+             y + generator.randrange(40, 300)),
+            fill=tuple(generator.randrange(256) for _ in range(3)))
+    return image
+
+
+def uploaded(image, name="photo.jpg", quality=90):
+    buffer = BytesIO()
+    image.save(buffer, "JPEG", quality=quality)
+    return SimpleUploadedFile(name, buffer.getvalue(), "image/jpeg")
+
+
+def test_dhash_tolerates_recompression_and_crop():
+    original = picture(1)
+    copy = Image.open(uploaded(original, quality=30)).crop(
+        (8, 6, 632, 474)).resize((320, 240))
+    distance = hamming(int(dhash(original), 16), int(dhash(copy), 16))
+    assert distance <= IMAGE_DUPLICATE_DISTANCE, (
+        "Пережатая и слегка обрезанная копия должна иметь близкий хеш."
+    )
+    assert hamming(int(dhash(original), 16),
+                   int(dhash(picture(2)), 16)) > IMAGE_DUPLICATE_DISTANCE
+
+
+def test_band_candidates_cover_radius():
+    generator = random.Random(0)
+    band_radius = IMAGE_DUPLICATE_DISTANCE // IMAGE_HASH_BANDS
+    for _ in range(300):
+        value = generator.getrandbits(64)
+        other = value
+        for bit in generator.sample(
+                range(64), generator.randint(0, IMAGE_DUPLICATE_DISTANCE)):
+            other ^= 1 << bit
+        bands = hash_bands(f"{value:016x}")
+        other_bands = hash_bands(f"{other:016x}")
+        assert any(
+            other_bands[field] in band_neighbours(bands[field], band_radius)
+            for field in bands), (
+            "Хеш в пределах радиуса должен найтись хотя бы по одной части."
+        )
+
+
+@pytest.mark.django_db
+def test_admin_lists_duplicate_clusters(
+        settings, tmp_path, mixer, admin_client, user):
+    settings.MEDIA_ROOT = tmp_path
+    original = picture(3)
+    posts = []
+    for number, image in enumerate((
+            original, original.crop((10, 10, 630, 470)), picture(4))):
+        post = mixer.blend("blog.Post", author=user, title=f"Пост {number}")
+        post.image = uploaded(image, f"{number}.jpg", quality=60 + number)
+        post.save()
+        posts.append(post)
+    call_command("run_image_worker", once=True, processes=0)
+    for post in posts:
+        post.refresh_from_db()
+        assert len(post.image_hash) == 16
+
+    assert [pk for _, pk in similar_posts(posts[0].image_hash)] == [
+        posts[0].pk, posts[1].pk]
+    assert [ImageHash.objects.get(post=post).cluster for post in posts] == [
+        posts[0].pk, posts[0].pk, None], (
+        "Обработчик картинок должен объединять похожие картинки в группу, "
+        "а непохожую оставлять без группы."
+    )
+
+    response = admin_client.get(reverse("admin:blog_post_duplicates"))
+    assert response.status_code == 200
+    content = response.content.decode()
+    assert "Пост 0" in content and "Пост 1" in content
+    assert "Пост 2" not in content
+    response = admin_client.get(
+        reverse("admin:blog_post_change", args=(posts[0].pk,)))
+    assert "Пост 1" in response.content.decode(), (
+        "На странице публикации должны быть ссылки на похожие картинки."
+    )
+
+
+@pytest.mark.django_db
+def test_clusters_are_rebuilt_by_command(
+        settings, tmp_path, mixer, user):
+    settings.MEDIA_ROOT = tmp_path
+    original = picture(5)
+    posts = []
+    for number in range(3):
+        post = mixer.blend("blog.Post", author=user)
+        post.image = uploaded(original, f"{number}.jpg", quality=50 + number)
+        post.save()
+        posts.append(post)
+    call_command("run_image_worker", once=True, processes=0)
+    for post in posts:
+        post.refresh_from_db()
+    ImageHash.objects.update(cluster=None)
+    posts[0].delete()
+    call_command("cluster_image_duplicates", stdout=StringIO())
+    assert set(ImageHash.objects.values_list("cluster", flat=True)) == {
+        posts[1].pk}
+    assert posts[0].pk not in [
+        pk for _, pk in similar_posts(posts[1].image_hash)], (
+        "Удалённая публикация не должна находиться среди похожих."
+    )
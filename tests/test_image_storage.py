@@ -0,0 +1,76 @@
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+from blog.models import Post
+
+
+def uploaded_image(color, name="photo.jpg"):
+    buffer = BytesIO()
+    Image.new("RGB", (40, 30), color).save(buffer, "JPEG")
+    return SimpleUploadedFile(name, buffer.getvalue(), "image/jpeg")
+
+
+def collect_garbage(**options):
+    out = StringIO()
+    call_command("collect_image_garbage", stdout=out, **options)
+    return out.getvalue()
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+@pytest.mark.django_db
+def test_identical_uploads_are_stored_once(
+        media_root, mixer, post_with_published_location):
+    first = post_with_published_location
+    first.image = uploaded_image("red", "first.jpg")
+    first.save()
+    second = mixer.blend("blog.Post", author=first.author)
+    second.image = uploaded_image("red", "second.JPG")
+    second.save()
+    assert first.image.name == second.image.name, (
+        "Одинаковые картинки должны храниться под одним именем."
+    )
+    digest = first.image.name.split("/")[-1].split(".")[0]
+    assert first.image.name == f"posts_images/{digest[:2]}/{digest}.jpg"
+    assert len([
+        path for path in (media_root / "posts_images").rglob("*")
+        if path.suffix == ".jpg" and ".w" not in path.name
+    ]) == 1
+
+
+@pytest.mark.django_db
+def test_garbage_collection_removes_unreferenced_blobs(
+        media_root, post_with_published_location):
+    post = post_with_published_location
+    post.image = uploaded_image("red")
+    post.save()
+    kept = media_root / post.image.name
+    post.image = uploaded_image("blue")
+    post.save()
+    orphan, current = kept, media_root / post.image.name
+    legacy = media_root / "posts_images" / "legacy.jpg"
+    legacy.write_bytes(b"legacy")
+
+    assert "Удалено файлов: 0" in collect_garbage(), (
+        "Недавно загруженные файлы не удаляются."
+    )
+    assert "Будет удалено файлов:" in collect_garbage(
+        min_age=0, dry_run=True)
+    assert orphan.exists()
+    collect_garbage(min_age=0)
+    assert not orphan.exists(), (
+        "Картинка, на которую больше не ссылается ни одна публикация, "
+        "должна удаляться."
+    )
+    assert current.exists() and legacy.exists(), (
+        "Сборщик мусора не должен трогать картинки, на которые ссылаются "
+        "публикации, и файлы не из хранилища по хешам."
+    )
@@ -0,0 +1,130 @@
+import gc
+import json
+import subprocess
+import sys
+import threading
+from http import HTTPStatus
+
+import pytest
+from django.urls import reverse
+
+from blog.metrics import MetricsRegistry, dump_snapshot, label_key, registry
+
+
+def metric_value(snapshot, name, **labels):
+    return snapshot["values"].get((name, label_key(labels)), 0)
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint(client, admin_client, mixer,
+                          post_with_published_location, user):
+    before = registry.snapshot()
+    client.get(reverse("blog:index"))
+    client.get(reverse("blog:index"))
+    client.get("/no-such-page/")
+    mixer.blend("blog.Comment", post=post_with_published_location,
+                author=user)
+    after = registry.snapshot()
+
+    for labels, expected in (
+            ({"view": "blog:index", "method": "GET", "status": 200}, 2),
+            ({"view": "unresolved", "method": "GET", "status": 404}, 1)):
+        assert (metric_value(after, "blog_http_requests_total", **labels)
+                - metric_value(before, "blog_http_requests_total", **labels)
+                == expected)
+    assert metric_value(
+        after, "blog_writes_total", model="comment", action="created"
+    ) - metric_value(
+        before, "blog_writes_total", model="comment", action="created") == 1
+    assert metric_value(
+        after, "blog_cache_hits_total", layer="page"
+    ) > metric_value(before, "blog_cache_hits_total", layer="page"), (
+        "Попадания в кэш страниц должны учитываться по слою `page`."
+    )
+
+    response = admin_client.get(reverse("metrics"))
+    assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+    content = response.content.decode()
+    assert "# TYPE blog_http_request_duration_seconds histogram" in content
+    assert ('blog_http_request_duration_seconds_bucket'
+            '{view="blog:index",le="+Inf"}') in content
+    assert "blog_http_requests_in_flight 1" in content
+    assert 'blog_db_queries_total{view="blog:index"}' in content
+
+
+def test_metrics_are_merged_across_processes(tmp_path):
+    finished = subprocess.Popen([sys.executable, "-c", "pass"])
+    finished.wait()
+    other = MetricsRegistry()
+    other.inc("blog_http_requests_total", view="blog:index")
+    other.inc("blog_http_requests_in_flight")
+    (tmp_path / f"metrics-{finished.pid}.json").write_text(
+        json.dumps(dump_snapshot(other.snapshot())))
+
+    local = MetricsRegistry()
+    local.inc("blog_http_requests_total", 2, view="blog:index")
+    merged = local.collect(tmp_path)
+    assert metric_value(
+        merged, "blog_http_requests_total", view="blog:index") == 3
+    assert metric_value(merged, "blog_http_requests_in_flight") == 0, (
+        "Gauge завершившегося процесса не должен учитываться."
+    )
+
+
+def test_finished_threads_do_not_leak_shards():
+    metrics = MetricsRegistry()
+
+    def work():
+        metrics.inc("blog_writes_total", model="post", action="created")
+        metrics.observe("blog_http_request_duration_seconds", 0.01,
+                        view="blog:index")
+
+    for _ in range(200):
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+    del thread
+    gc.collect()
+    snapshot = metrics.snapshot()
+    assert len(metrics.shards) <= 1, (
+        "Шарды завершившихся потоков должны сливаться в общий итог."
+    )
+    assert metric_value(snapshot, "blog_writes_total", model="post",
+                        action="created") == 200
+    assert sum(snapshot["histograms"][(
+        "blog_http_request_duration_seconds",
+        label_key({"view": "blog:index"}))]) == 200
+
+
+@pytest.mark.django_db
+def test_metrics_require_staff_or_token(settings, client, user_client):
+    url = reverse("metrics")
+    assert client.get(url).status_code == HTTPStatus.FOUND
+    assert user_client.get(url).status_code == HTTPStatus.FORBIDDEN
+    settings.BLOG_METRICS_TOKEN = "secret"
+    assert client.get(
+        url, HTTP_AUTHORIZATION="Bearer wrong").status_code == HTTPStatus.FOUND
+    assert client.get(
+        url, HTTP_AUTHORIZATION="Bearer secret").status_code == HTTPStatus.OK
+
+
+def test_retire_does_not_take_snapshot_lock():
+    metrics = MetricsRegistry()
+    metrics.inc("blog_writes_total", model="post", action="created")
+    shard = metrics.shard
+
+    # Так финализатор срабатывает при сборке мусора внутри snapshot().
+    thread = threading.Thread(target=metrics.retire, args=(shard,))
+    with metrics.lock:
+        thread.start()
+        thread.join(timeout=5)
+        retired = not thread.is_alive()
+    thread.join()
+    assert retired, (
+        "Перенос шарда завершившегося потока не должен ждать блокировку"
+        " снимка."
+    )
+    snapshot = metrics.snapshot()
+    assert not metrics.shards
+    assert metric_value(snapshot, "blog_writes_total", model="post",
+                        action="created") == 1
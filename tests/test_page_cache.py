@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.checks import check_shared_default_cache
+
+
+@pytest.fixture
+def cached_post(mixer: Mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(days=1),
+        title="Исходный заголовок")
+
+
+def silently_rename(post, title):
+    type(post).objects.filter(pk=post.pk).update(title=title)
+
+
+@pytest.mark.django_db
+def test_anonymous_pages_are_cached(client, user_client, cached_post):
+    url = f"/posts/{cached_post.pk}/"
+    client.get(url)
+    silently_rename(cached_post, "Тихая правка")
+    assert "Исходный заголовок" in client.get(url).content.decode(), (
+        "Убедитесь, что страница публикации кэшируется для анонимных"
+        " посетителей."
+    )
+    assert "Тихая правка" in user_client.get(url).content.decode(), (
+        "Убедитесь, что авторизованные пользователи не получают страницы"
+        " из кэша."
+    )
+
+
+@pytest.mark.django_db
+def test_page_cache_purges_only_dependent_pages(
+        mixer: Mixer, client, cached_post, another_category):
+    post_url = f"/posts/{cached_post.pk}/"
+    category_url = f"/category/{another_category.slug}/"
+    client.get(post_url)
+    client.get(category_url)
+
+    silently_rename(cached_post, "Тихая правка")
+    another_category.title = "Другое название"
+    another_category.save()
+    assert "Исходный заголовок" in client.get(post_url).content.decode(), (
+        "Убедитесь, что изменение категории не сбрасывает кэш страниц,"
+        " которые от неё не зависят."
+    )
+    assert "Другое название" in client.get(category_url).content.decode()
+
+    mixer.blend("blog.Comment", post=cached_post, text="Новый комментарий")
+    content = client.get(post_url).content.decode()
+    assert "Новый комментарий" in content, (
+        "Убедитесь, что новый комментарий сбрасывает кэш страницы публикации."
+    )
+
+
+def test_per_process_default_cache_is_reported(settings):
+    settings.DEBUG = False
+    assert [warning.id for warning in check_shared_default_cache(None)] == [
+        "blog.W001"], (
+        "Кэш default в памяти процесса должен давать предупреждение: "
+        "сброс кэша страниц не дойдёт до других worker."
+    )
+    settings.DEBUG = True
+    assert check_shared_default_cache(None) == []
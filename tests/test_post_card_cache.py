@@ -0,0 +1,59 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+
+@pytest.fixture
+def feed_post(mixer: Mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(days=1),
+        title="Первый заголовок")
+
+
+@pytest.mark.django_db
+def test_post_card_is_cached_until_save(user_client, feed_post):
+    assert "Первый заголовок" in user_client.get("/").content.decode()
+
+    type(feed_post).objects.filter(pk=feed_post.pk).update(
+        title="Тихая правка")
+    assert "Первый заголовок" in user_client.get("/").content.decode(), (
+        "Убедитесь, что карточка публикации берётся из кэша."
+    )
+
+    feed_post.title = "Новый заголовок"
+    feed_post.save()
+    content = user_client.get("/").content.decode()
+    assert "Новый заголовок" in content, (
+        "Убедитесь, что сохранение публикации сбрасывает кэш её карточки."
+    )
+
+
+@pytest.mark.django_db
+def test_post_card_follows_comments(mixer: Mixer, user_client, feed_post):
+    assert "Комментарии (0)" in user_client.get("/").content.decode()
+    mixer.blend("blog.Comment", post=feed_post)
+    assert "Комментарии (1)" in user_client.get("/").content.decode(), (
+        "Убедитесь, что новый комментарий сбрасывает кэш карточки публикации."
+    )
+
+
+@pytest.mark.django_db
+def test_unrelated_writes_keep_post_card(
+        mixer: Mixer, user_client, feed_post, another_user):
+    other_post = mixer.blend(
+        "blog.Post", author=another_user, category=feed_post.category,
+        pub_date=feed_post.pub_date)
+    user_client.get("/")
+    type(feed_post).objects.filter(pk=feed_post.pk).update(
+        title="Тихая правка")
+    mixer.blend("blog.Comment", post=other_post)
+    another_user.first_name = "Иван"
+    another_user.save()
+    mixer.blend("auth.User")
+    assert "Первый заголовок" in user_client.get("/").content.decode(), (
+        "Убедитесь, что правки чужих публикаций, комментариев и "
+        "пользователей не сбрасывают кэш карточки."
+    )
@@ -0,0 +1,42 @@
+import pytest
+from mixer.backend.django import Mixer
+
+
+@pytest.mark.django_db
+def test_category_toggle_updates_post_visibility(
+        mixer: Mixer, user, published_category):
+    posts = mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True)
+    hidden_post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=False)
+    Post = type(hidden_post)
+    visible_ids = set(
+        Post.objects.filter(is_visible=True).values_list("pk", flat=True))
+    assert visible_ids == {post.pk for post in posts}
+
+    published_category.is_published = False
+    published_category.save()
+    assert not Post.objects.filter(is_visible=True).exists(), (
+        "Убедитесь, что снятие категории с публикации скрывает её посты."
+    )
+
+    published_category.is_published = True
+    published_category.save()
+    assert set(
+        Post.objects.filter(is_visible=True).values_list("pk", flat=True)
+    ) == visible_ids, (
+        "Убедитесь, что при публикации категории снова видны только"
+        " опубликованные посты."
+    )
+
+
+@pytest.mark.django_db
+def test_deleted_category_hides_posts(mixer: Mixer, user, published_category):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True)
+    published_category.delete()
+    post.refresh_from_db()
+    assert not post.is_visible
@@ -0,0 +1,61 @@
+import pytest
+from django.urls import reverse
+
+LISTING_VIEWS = (
+    "blog:index",
+    "blog:category_posts",
+    "blog:profile",
+    "blog:tag",
+    "blog:post_detail",
+    "blog:post_comments",
+    "blog:random",
+    "pages:about",
+    "pages:rules",
+)
+EDIT_VIEWS = (
+    ("blog:edit_post", "get"),
+    ("blog:delete_post", "get"),
+    ("blog:edit_comment", "get"),
+    ("blog:edit_comment", "post"),
+    ("blog:delete_comment", "get"),
+)
+
+
+def view_url(view_name, dataset, user):
+    post = dataset.comment.post
+    kwargs = {
+        "blog:category_posts": {"category_slug": dataset.categories[0].slug},
+        "blog:profile": {"username": user.username},
+        "blog:tag": {"tag_slug": dataset.tags[0].slug},
+        "blog:post_detail": {"post_id": post.pk},
+        "blog:post_comments": {"post_id": post.pk},
+        "blog:edit_post": {"post_id": post.pk},
+        "blog:delete_post": {"post_id": post.pk},
+        "blog:edit_comment": {
+            "post_id": post.pk, "comment_id": dataset.comment.pk},
+        "blog:delete_comment": {
+            "post_id": post.pk, "comment_id": dataset.comment.pk},
+    }.get(view_name, {})
+    return reverse(view_name, kwargs=kwargs)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("view_name", LISTING_VIEWS)
+@pytest.mark.parametrize("logged_in", [False, True])
+def test_view_within_budget(
+        view_name, logged_in, client, user_client, user, seeded_dataset,
+        assert_view_within_budget):
+    assert_view_within_budget(
+        user_client if logged_in else client,
+        view_url(view_name, seeded_dataset, user))
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(("view_name", "method"), EDIT_VIEWS)
+def test_edit_view_within_budget(
+        view_name, method, user_client, user, seeded_dataset,
+        assert_view_within_budget):
+    assert seeded_dataset.comment.author == user
+    assert_view_within_budget(
+        user_client, view_url(view_name, seeded_dataset, user),
+        method=method, data={"text": "Новый текст"})
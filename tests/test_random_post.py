@@ -0,0 +1,46 @@
+from array import array
+from http import HTTPStatus
+
+import pytest
+
+from blog.random_posts import random_post_ids
+
+
+@pytest.mark.django_db
+def test_random_post_is_published(
+        client, post_with_published_location, posts_with_unpublished_category,
+        future_posts):
+    for _ in range(10):
+        response = client.get("/random/")
+        assert response.status_code == HTTPStatus.OK
+        assert response.context["number"] == (
+            post_with_published_location.pk), (
+            "Убедитесь, что на странице случайного поста выбираются только"
+            " опубликованные публикации."
+        )
+
+
+@pytest.mark.django_db
+def test_random_post_follows_unpublishing(
+        client, post_with_published_location):
+    assert client.get("/random/").status_code == HTTPStatus.OK
+    post_with_published_location.is_published = False
+    post_with_published_location.save()
+    assert client.get("/random/").status_code == HTTPStatus.NOT_FOUND, (
+        "Убедитесь, что снятая с публикации запись не выбирается на странице"
+        " случайного поста."
+    )
+
+
+@pytest.mark.django_db
+def test_random_post_skips_stale_ids(
+        client, post_with_published_location, monkeypatch):
+    post = post_with_published_location
+    random_post_ids.get()
+    monkeypatch.setattr(random_post_ids, "ids", array("q", [post.pk + 1]))
+    response = client.get("/random/")
+    assert response.status_code == HTTPStatus.OK, (
+        "Если в списке другого процесса остался id удалённой публикации, "
+        "случайный пост должен выбираться заново, а не отвечать 404."
+    )
+    assert response.context["number"] == post.pk
@@ -0,0 +1,48 @@
+import re
+from http import HTTPStatus
+
+import pytest
+from django.urls import reverse
+
+FOLDED_LINE = re.compile(r"^\S.* \d+$")
+
+
+@pytest.fixture
+def category_url(published_category):
+    return reverse("blog:category_posts", args=(published_category.slug,))
+
+
+@pytest.mark.django_db
+def test_trace_profile_is_returned_to_staff(admin_client, category_url):
+    response = admin_client.get(category_url, {"profile": "trace"})
+    assert response.status_code == HTTPStatus.OK
+    assert response["Content-Type"].startswith("text/plain")
+    assert response["X-Profiled-Status"] == "200"
+    lines = response.content.decode().splitlines()
+    assert lines and all(FOLDED_LINE.match(line) for line in lines), (
+        "Профиль должен быть в формате collapsed: `стек;стек вес`."
+    )
+    assert any("blog.views:get_context_data" in line for line in lines)
+
+
+@pytest.mark.django_db
+def test_sample_profile_is_stored_by_cookie(
+        settings, admin_client, category_url, tmp_path):
+    settings.BLOG_PROFILE_DIR = tmp_path
+    admin_client.cookies["blog_profile"] = "sample"
+    response = admin_client.get(category_url)
+    assert response.status_code == HTTPStatus.OK
+    assert response["Content-Type"].startswith("text/html")
+    stored = tmp_path / response["X-Profile"]
+    assert stored.exists()
+    assert all(FOLDED_LINE.match(line)
+               for line in stored.read_text().splitlines())
+
+
+@pytest.mark.django_db
+def test_profile_flag_is_ignored_for_other_users(
+        client, user_client, category_url):
+    for other_client in (client, user_client):
+        response = other_client.get(category_url, {"profile": "trace"})
+        assert response["Content-Type"].startswith("text/html")
+        assert not response.has_header("X-Profiled-Status")
@@ -0,0 +1,94 @@
+from io import BytesIO
+
+import pytest
+from django.urls import reverse
+from PIL import Image
+
+from blog.models import Post
+from blog.resized_images import ResizedImageCache, resized_image_url
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path / "media"
+    settings.BLOG_RESIZED_CACHE_DIR = tmp_path / "resized"
+    return settings.MEDIA_ROOT
+
+
+@pytest.fixture
+def source(media_root):
+    (media_root / "posts_images").mkdir(parents=True)
+    Image.new("RGB", (1200, 800), "red").save(
+        media_root / "posts_images" / "photo.jpg", "JPEG")
+    return "posts_images/photo.jpg"
+
+
+@pytest.mark.django_db
+def test_resized_copy_is_cached(client, source, settings):
+    url = resized_image_url(source, 300, 300)
+    response = client.get(url)
+    assert response.status_code == 200
+    assert "immutable" in response["Cache-Control"]
+    with Image.open(BytesIO(b"".join(response.streaming_content))) as image:
+        assert image.size == (300, 200), (
+            "Копия должна вписываться в запрошенный размер с сохранением "
+            "пропорций."
+        )
+    cached = [path for path in settings.BLOG_RESIZED_CACHE_DIR.rglob("*.jpg")]
+    assert len(cached) == 1
+    assert cached[0].parent.parent.parent == settings.BLOG_RESIZED_CACHE_DIR
+
+    response = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert response.status_code == 304
+
+
+@pytest.mark.django_db
+def test_unsigned_and_foreign_paths_are_rejected(client, source, settings):
+    url = resized_image_url(source, 300, 300)
+    assert client.get(url.replace("300x300", "301x300")).status_code == 403, (
+        "Размеры без подписи не должны порождать новые копии."
+    )
+    assert client.get(url.split("?")[0]).status_code == 403
+    (settings.MEDIA_ROOT / "secret.jpg").write_bytes(b"")
+    for path in ("posts_images/../secret.jpg", "posts_images/missing.jpg"):
+        assert client.get(resized_image_url(path, 300, 300)).status_code == 404
+    assert client.get(resized_image_url(source, 0, 300)).status_code == 404
+
+
+@pytest.mark.django_db
+def test_delete_page_shows_resized_preview(
+        user_client, post_with_published_location, source):
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(image=source)
+    response = user_client.get(
+        reverse("blog:delete_post", args=(post.pk,)))
+    assert resized_image_url(source, 640, 640).replace(
+        "&", "&amp;") in response.content.decode()
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = ResizedImageCache(tmp_path, max_bytes=250)
+    paths = [cache.path(f"{index:064x}", ".jpg") for index in range(3)]
+    cache.put(paths[0], b"0" * 100)
+    cache.put(paths[1], b"1" * 100)
+    cache.get(paths[0])
+    cache.put(paths[2], b"2" * 100)
+    assert [path.exists() for path in paths] == [True, False, True], (
+        "При превышении бюджета удаляется давно не запрошенная копия."
+    )
+    assert cache.size == 200
+
+
+@pytest.mark.django_db
+def test_reuploaded_blob_keeps_resized_copy(client, media_root):
+    storage = Post._meta.get_field("image").storage
+    buffer = BytesIO()
+    Image.new("RGB", (600, 400), "blue").save(buffer, "JPEG")
+    name = storage.save("posts_images/photo.jpg", BytesIO(buffer.getvalue()))
+    url = resized_image_url(name, 300, 300)
+    etag = client.get(url)["ETag"]
+    assert storage.save(
+        "posts_images/again.jpg", BytesIO(buffer.getvalue())) == name
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304, (
+        "Повторная загрузка той же картинки не должна сбрасывать её копии."
+    )
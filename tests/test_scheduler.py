@@ -0,0 +1,28 @@
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+
+@pytest.mark.django_db
+def test_scheduled_post_goes_live_without_restart(
+        mixer: Mixer, client, user, published_category):
+    now = timezone.now()
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=now + timedelta(hours=1),
+        title="Отложенная публикация")
+    assert "Отложенная публикация" not in client.get("/").content.decode()
+    assert client.get(f"/posts/{post.pk}/").status_code == 404
+
+    later = now + timedelta(hours=2)
+    with mock.patch("django.utils.timezone.now", return_value=later):
+        assert "Отложенная публикация" in client.get("/").content.decode(), (
+            "Убедитесь, что отложенная публикация появляется в ленте, как"
+            " только наступает время публикации."
+        )
+        assert client.get(f"/posts/{post.pk}/").status_code == 200
+    post.refresh_from_db()
+    assert post.is_visible
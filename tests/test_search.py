@@ -0,0 +1,77 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+
+@pytest.fixture
+def searchable_posts(mixer: Mixer, user, published_category):
+    pub_date = timezone.now() - timedelta(days=1)
+    tag = mixer.blend("blog.Tag", tag="Путешествия", slug="travel")
+    first = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=pub_date,
+        title="Прогулка по Москве",
+        text="Красная площадь вечером")
+    second = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=pub_date,
+        title="Рецепт борща", text="Свёкла и капуста")
+    second.tags.add(tag)
+    return first, second
+
+
+def search(client, query):
+    response = client.get("/", {"q": query})
+    return [post.pk for post in response.context["page_obj"]]
+
+
+@pytest.mark.django_db
+def test_search_is_case_insensitive(client, searchable_posts):
+    first, _ = searchable_posts
+    assert search(client, "МОСКВ") == [first.pk], (
+        "Убедитесь, что поиск по заголовку не зависит от регистра."
+    )
+    assert search(client, "площадь") == [first.pk], (
+        "Убедитесь, что поиск учитывает текст публикации."
+    )
+
+
+@pytest.mark.django_db
+def test_search_follows_tags(client, searchable_posts):
+    first, second = searchable_posts
+    assert search(client, "путешествия") == [second.pk]
+    second.tags.clear()
+    first.tags.add(second.tags.model.objects.get(slug="travel"))
+    assert search(client, "путешествия") == [first.pk], (
+        "Убедитесь, что поисковый индекс обновляется при изменении тегов."
+    )
+
+
+@pytest.mark.django_db
+def test_rebuild_search_index(client, searchable_posts):
+    first, _ = searchable_posts
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM blog_post_fts")
+    assert search(client, "москве") == []
+    call_command("rebuild_search_index", stdout=StringIO())
+    assert search(client, "москве") == [first.pk]
+
+
+@pytest.mark.django_db
+def test_search_limit_counts_only_visible_posts(
+        client, searchable_posts, mixer: Mixer, user, published_category,
+        monkeypatch):
+    first, _ = searchable_posts
+    mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=False, title="Москва", text="Москва Москва")
+    monkeypatch.setattr("blog.search.search_post_ids.__defaults__", (1,))
+    assert search(client, "москв") == [first.pk], (
+        "Убедитесь, что скрытые публикации не вытесняют видимые из "
+        "ограниченной выдачи поиска."
+    )
@@ -0,0 +1,34 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from blog.models import Comment, Post
+
+
+@pytest.mark.django_db
+def test_seed_blog_keeps_denormalized_fields_consistent():
+    call_command(
+        "seed_blog", users=10, categories=3, locations=3, tags=5, posts=120,
+        comments=300, batch_size=50, deferred_share=0.2,
+        unpublished_share=0.2, seed=1, stdout=StringIO())
+    assert Post.objects.count() == 120
+    assert Comment.objects.count() == 300
+    visible = Q(
+        is_published=True, category__is_published=True,
+        pub_date__lte=timezone.now())
+    assert not Post.objects.filter(visible, is_visible=False).exists(), (
+        "Команда `seed_blog` должна помечать видимые публикации "
+        "флагом `is_visible`."
+    )
+    assert not Post.objects.filter(~visible, is_visible=True).exists(), (
+        "Команда `seed_blog` не должна помечать видимыми отложенные и "
+        "снятые с публикации посты."
+    )
+    assert not Post.objects.annotate(
+        counted=Count("commented_post")).exclude(
+        counted=F("comment_count")).exists(), (
+        "Команда `seed_blog` должна заполнять `comment_count`."
+    )
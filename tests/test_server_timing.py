@@ -0,0 +1,47 @@
+import json
+import logging
+import re
+
+import pytest
+from django.urls import reverse
+
+from blog.middleware import access_logger
+
+
+def server_timing(response):
+    return {
+        name: float(duration) for name, duration in re.findall(
+            r"(\w+);dur=([\d.]+)", response["Server-Timing"])
+    }
+
+
+@pytest.mark.django_db
+def test_server_timing_header_and_access_log(
+        client, post_with_published_location, caplog, monkeypatch):
+    monkeypatch.setattr(access_logger, "propagate", True)
+    url = reverse("blog:post_detail", args=(post_with_published_location.pk,))
+    with caplog.at_level(logging.INFO, logger="blog.access"):
+        response = client.get(url)
+        cached_response = client.get(url)
+
+    timing = server_timing(response)
+    assert set(timing) == {"db", "tpl", "cache", "view", "total"}, (
+        "Заголовок `Server-Timing` должен содержать время БД, шаблонов, "
+        "кэша и view."
+    )
+    assert timing["db"] > 0 and timing["tpl"] > 0
+    assert timing["total"] >= timing["view"]
+
+    records = [json.loads(record.message) for record in caplog.records
+               if record.name == "blog.access"]
+    assert len(records) == 2
+    first, second = records
+    assert first["view"] == "blog:post_detail"
+    assert first["status"] == 200
+    assert first["path"] == url
+    assert first["db_queries"] > 0 and first["cache_misses"] > 0
+    assert second["db_queries"] < first["db_queries"], (
+        "Повторный анонимный запрос должен обслуживаться из кэша страниц."
+    )
+    assert second["cache_hits"] > 0
+    assert "Server-Timing" in cached_response
@@ -0,0 +1,53 @@
+import json
+import logging
+import time
+
+import pytest
+from django.urls import reverse
+
+from blog.views import PostListView
+from blog.watchdog import logger as slow_requests_logger
+
+
+@pytest.mark.django_db
+def test_slow_request_stacks_are_logged(
+        settings, user_client, caplog, monkeypatch):
+    settings.BLOG_SLOW_REQUEST_THRESHOLD = 0.01
+    monkeypatch.setattr(slow_requests_logger, "propagate", True)
+    get_queryset = PostListView.get_queryset
+
+    def slow_get_queryset(self):
+        time.sleep(0.3)
+        return get_queryset(self)
+
+    monkeypatch.setattr(PostListView, "get_queryset", slow_get_queryset)
+    with caplog.at_level(logging.WARNING, logger="blog.slow_requests"):
+        user_client.get(reverse("blog:index"))
+
+    records = {
+        record["event"]: record
+        for record in map(json.loads, (
+            record.message for record in caplog.records
+            if record.name == "blog.slow_requests"))
+    }
+    assert set(records) == {"slow_request_started", "slow_request"}, (
+        "Медленный запрос должен попадать в журнал `blog.slow_requests`."
+    )
+    record = records["slow_request"]
+    assert record["url"] == reverse("blog:index")
+    assert record["view_class"] == "PostListView"
+    assert record["elapsed_ms"] >= 300
+    assert record["queries"], "В записи должен быть выполненный SQL."
+    assert any("test_slow_requests:slow_get_queryset" in stack
+               for stack in record["stacks"]), (
+        "Стеки должны быть в формате collapsed и вести в код view."
+    )
+
+
+@pytest.mark.django_db
+def test_fast_requests_are_not_logged(user_client, caplog, monkeypatch):
+    monkeypatch.setattr(slow_requests_logger, "propagate", True)
+    with caplog.at_level(logging.WARNING, logger="blog.slow_requests"):
+        user_client.get(reverse("blog:index"))
+    assert not [record for record in caplog.records
+                if record.name == "blog.slow_requests"]
@@ -0,0 +1,47 @@
+from http import HTTPStatus
+
+import pytest
+from django.urls import reverse
+
+from blog.profiling import fingerprint, profile
+
+
+def test_fingerprint_strips_literals_and_parameter_lists():
+    assert fingerprint(
+        'SELECT "blog_post"."id" FROM "blog_post"\n'
+        "WHERE \"blog_post\".\"title\" = 'x''y' AND \"id\" IN (%s, %s, %s) "
+        "LIMIT 21"
+    ) == ('SELECT "blog_post"."id" FROM "blog_post" '
+          'WHERE "blog_post"."title" = ? AND "id" IN (...) LIMIT ?')
+    assert fingerprint("INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s)") == (
+        fingerprint("INSERT INTO t (a, b) VALUES (%s, %s)"))
+
+
+@pytest.mark.django_db
+def test_sampled_requests_are_aggregated(
+        settings, client, admin_client, user_client,
+        post_with_published_location):
+    settings.BLOG_SQL_PROFILE_SAMPLE_RATE = 1
+    profile.reset()
+    for _ in range(3):
+        user_client.get(reverse("blog:post_detail", args=(
+            post_with_published_location.pk,)))
+    assert profile.requests == 3
+    post_queries = [
+        item for item in profile.top("calls")
+        if item.sql.startswith("SELECT") and 'FROM "blog_post"' in item.sql
+    ]
+    assert post_queries and post_queries[0].calls >= 3, (
+        "Запросы одного шаблона должны агрегироваться по отпечатку."
+    )
+
+    url = reverse("sql_profile")
+    assert client.get(url).status_code == HTTPStatus.FOUND
+    assert user_client.get(url).status_code == HTTPStatus.FORBIDDEN
+    response = admin_client.get(url, {"order": "rows"})
+    assert response.status_code == HTTPStatus.OK
+    assert response.context["order_by"] == "rows"
+    assert post_queries[0] in response.context["fingerprints"]
+    assert post_queries[0].rows >= 3
+    admin_client.post(url)
+    assert post_queries[0].sql not in {item.sql for item in profile.top()}